@@ -9,8 +9,30 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from core.handlers import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'true')
+
+# What get_asgi_application() does, with a handler that reads streaming
+# responses such as the reservation export outside the event loop
+django.setup(set_prefix=False)
+
+# Needs the apps loaded by django.setup()
+from restaurant.streams import (  # noqa: E402
+    AVAILABLE_SLOTS_STREAM_PATH, available_slots_stream
+)
+
+django_application = ASGIHandler()
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    # Django 3.2 can't stream from a coroutine, so the push channel is
+    # served next to it
+    if scope['type'] == 'http' and \
+            scope['path'] == AVAILABLE_SLOTS_STREAM_PATH:
+        await available_slots_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,163 @@
+import threading
+import time
+from django.db.backends.postgresql.base import (
+    Database, DatabaseWrapper as PostgresDatabaseWrapper
+)
+
+
+class ConnectionPool:
+    """
+    Open connections shared by the threads of a process.
+
+    At most size connections exist at once; callers wait up to timeout
+    seconds for one to be returned. Connections left idle for longer
+    than max_idle seconds are closed rather than reused.
+    """
+
+    def __init__(self, size, max_idle, timeout):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def get(self, connect, is_usable=None):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                'No database connection available in the pool.'
+            )
+        try:
+            while True:
+                with self.lock:
+                    if not self.idle:
+                        break
+                    connection, returned_at = self.idle.pop()
+                if connection.closed or \
+                        time.monotonic() - returned_at > self.max_idle or \
+                        (is_usable and not is_usable(connection)):
+                    self.discard(connection)
+                    continue
+                return connection
+            return connect()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def put(self, connection):
+        try:
+            if not connection.closed and \
+                    connection.status != Database.extensions.STATUS_READY:
+                # Never hand out a connection in the middle of a transaction
+                connection.rollback()
+        except Database.Error:
+            self.discard(connection)
+        else:
+            if not connection.closed:
+                now = time.monotonic()
+                with self.lock:
+                    self.idle.append((connection, now))
+                    # The least recently used connections are at the front
+                    while self.idle and \
+                            now - self.idle[0][1] > self.max_idle:
+                        self.discard(self.idle.pop(0)[0])
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def discard(connection):
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(settings_dict):
+    key = tuple(
+        settings_dict[name] for name in ('NAME', 'USER', 'HOST', 'PORT')
+    )
+    with pools_lock:
+        if key not in pools:
+            options = settings_dict['POOL']
+            pools[key] = ConnectionPool(
+                options.get('SIZE', 10),
+                options.get('MAX_IDLE', 300),
+                options.get('TIMEOUT', 10)
+            )
+        return pools[key]
+
+
+def is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """
+    The PostgreSQL backend with two optional additions, enabled by keys of
+    the database settings:
+
+    CONN_HEALTH_CHECKS: checks that a persistent connection still works
+    before the first query of each request, reconnecting if it doesn't.
+    POOL: a dict with SIZE, MAX_IDLE and TIMEOUT; closed connections go
+    back to an in-process pool instead of being closed.
+    """
+
+    health_check_done = False
+
+    @property
+    def health_checks(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    @property
+    def pool(self):
+        if self.settings_dict.get('POOL'):
+            return get_pool(self.settings_dict)
+        return None
+
+    def get_new_connection(self, conn_params):
+        # A fresh connection needs no check, and pooled ones are checked
+        # when they're handed out
+        self.health_check_done = True
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.get(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            is_usable if self.health_checks else None
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.put(self.connection)
+
+    def ensure_connection(self):
+        if self.connection is not None and self.health_checks and \
+                not self.health_check_done:
+            # The server may have dropped the connection since the last
+            # request, check it once before reusing it
+            self.health_check_done = True
+            if not self.is_usable():
+                self.close()
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        # Called when a request starts and finishes
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
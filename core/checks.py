@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register('performance')
+def check_production_settings(app_configs, **kwargs):
+    # Settings that are fine while developing but cost memory or latency
+    # on every request of the production profile
+    if not settings.PRODUCTION:
+        return []
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG is on, every SQL query is kept in connection.queries.',
+            hint='Unset DJANGO_DEBUG.',
+            id='core.W001',
+        ))
+    renderers = settings.REST_FRAMEWORK.get('DEFAULT_RENDERER_CLASSES', ())
+    if 'rest_framework.renderers.BrowsableAPIRenderer' in renderers:
+        warnings.append(Warning(
+            'The browsable API renders HTML pages for API responses.',
+            id='core.W002',
+        ))
+    for template in settings.TEMPLATES:
+        loaders = template.get('OPTIONS', {}).get('loaders')
+        if settings.DEBUG and not (
+                loaders and 'cached' in str(loaders[0])):
+            warnings.append(Warning(
+                'Templates are loaded from disk on every render.',
+                hint='Use django.template.loaders.cached.Loader.',
+                id='core.W003',
+            ))
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE') and not database.get('POOL'):
+            warnings.append(Warning(
+                f"Database '{alias}' opens a new connection per request.",
+                hint='Set DB_CONN_MAX_AGE or DB_POOL_SIZE.',
+                id='core.W004',
+            ))
+    return warnings
+
+
+@register('performance')
+def check_connection_pool(app_configs, **kwargs):
+    # Under ASGI, every thread of the async views may hold a connection at
+    # once, and so may Django's thread for the other sync views
+    if not settings.ASYNC_VIEWS:
+        return []
+    threads = settings.ASYNC_VIEW_THREADS + 1
+    warnings = []
+    for alias, database in settings.DATABASES.items():
+        if not database.get('POOL'):
+            continue
+        size = database['POOL'].get('SIZE', 10)
+        if size < threads:
+            warnings.append(Warning(
+                f"Database '{alias}' pools {size} connections for {threads} "
+                'threads, requests will wait for a free one.',
+                hint=f'Set DB_POOL_SIZE to at least {threads}, or lower '
+                     'DJANGO_ASYNC_VIEW_THREADS.',
+                id='core.W006',
+            ))
+    return warnings
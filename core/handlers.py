@@ -0,0 +1,78 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+from django.db import connections
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """
+    Django's ASGI handler, except that streaming responses are read in a
+    thread of their own.
+
+    Django 3.2 iterates them in the event loop, where a response reading
+    the database as it goes (like the reservation export) raises
+    SynchronousOnlyOperation once the headers are sent.
+    """
+
+    # Parts of a streaming response read per trip to its thread
+    parts_per_read = 500
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        # Every read runs in the same thread, so a server-side cursor stays
+        # on the connection that opened it
+        executor = ThreadPoolExecutor(max_workers=1)
+        read = sync_to_async(
+            self.read_parts, thread_sensitive=False, executor=executor
+        )
+        close = sync_to_async(
+            self.close_response, thread_sensitive=False, executor=executor
+        )
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': self.response_headers(response),
+            })
+            parts = iter(response)
+            while True:
+                body = await read(parts)
+                if not body:
+                    break
+                await send({
+                    'type': 'http.response.body',
+                    'body': body,
+                    'more_body': True,
+                })
+            await send({'type': 'http.response.body'})
+        finally:
+            await close(response)
+            executor.shutdown(wait=False)
+
+    def read_parts(self, parts):
+        return b''.join(itertools.islice(parts, self.parts_per_read))
+
+    @staticmethod
+    def close_response(response):
+        response.close()
+        # The thread goes away with the response, and so do its connections
+        connections.close_all()
+
+    @staticmethod
+    def response_headers(response):
+        # Same as Django's send_response()
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((
+                b'Set-Cookie',
+                cookie.output(header='').encode('ascii').strip()
+            ))
+        return headers
@@ -0,0 +1,16 @@
+import json
+import logging
+
+
+class JSONFormatter(logging.Formatter):
+    # One JSON object per line, for log collectors to index
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
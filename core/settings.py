@@ -1,5 +1,7 @@
+from django.core.exceptions import ImproperlyConfigured
 from pathlib import Path
 from datetime import timedelta
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -8,13 +10,31 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
+# DJANGO_ENV=production selects the production profile: no debug query
+# logging, JSON-only responses, cached templates and JSON logs.
+PRODUCTION = os.environ.get('DJANGO_ENV', 'development') == 'production'
+
+# A JWT-only API needs neither sessions nor messages (nor the admin panel,
+# which depends on them); defaults to the production profile.
+API_ONLY = os.environ.get(
+    'DJANGO_API_ONLY', 'true' if PRODUCTION else 'false'
+).lower() == 'true'
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-0+2%x^$mogft=mb@+%ygwkzj7z3f^33tds7u_y@+=pt%*_=hk_'
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-0+2%x^$mogft=mb@+%ygwkzj7z3f^33tds7u_y@+=pt%*_=hk_'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get(
+    'DJANGO_DEBUG', 'false' if PRODUCTION else 'true'
+).lower() == 'true'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host
+]
 
 
 # Application definition
@@ -31,6 +51,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'drf_yasg',
 
+    'core',
     'users',
     'restaurant',
 ]
@@ -45,6 +66,23 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS if app not in (
+            'django.contrib.admin',
+            'django.contrib.sessions',
+            'django.contrib.messages',
+        )
+    ]
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE if middleware not in (
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.middleware.csrf.CsrfViewMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        )
+    ]
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -63,20 +101,57 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.template.context_processors.debug'
+    )
+if API_ONLY:
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.contrib.messages.context_processors.messages'
+    )
+
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The PostgreSQL backend plus connection health checks and an optional
+# in-process pool, see core/backends/postgresql/base.py. Set DB_POOL_SIZE
+# to pool connections; otherwise they persist for DB_CONN_MAX_AGE seconds.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'core.backends.postgresql',
         'NAME': 'restaurant',
         'USER': 'postgres',
         'PASSWORD': 'root',
         'HOST': 'localhost',
         'PORT': '',
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(
+            os.environ.get('DB_CONN_MAX_AGE', 60)
+        ),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'true'
+        ).lower() == 'true',
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'MAX_IDLE': int(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+            'TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        } if DB_POOL_SIZE else None,
+        'OPTIONS': {
+            # Milliseconds, 0 leaves statements without a time limit
+            'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT}',
+        },
     }
 }
 
@@ -127,20 +202,74 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
+# Relays availability changes to the streams of the ASGI app. The local
+# backend only reaches the streams of the process that saved the change.
+AVAILABILITY_BROADCAST_BACKEND = 'restaurant.broadcast.LocalBroadcast'
+
+# Awaits the availability and reservation endpoints from a pool of
+# ASYNC_VIEW_THREADS threads, each with its own database connection, instead
+# of Django's single thread for sync views. core/asgi.py turns it on; it only
+# adds overhead under WSGI.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', 'false').lower() == 'true'
+ASYNC_VIEW_THREADS = int(os.environ.get(
+    'DJANGO_ASYNC_VIEW_THREADS', min(32, (os.cpu_count() or 1) + 4)
+))
+
+# Holds the reservation times of every table for the day, the validators
+# of conditional GETs and the authenticated users. Writes invalidate them
+# in this cache only, so every process has to share it: DJANGO_CACHE_LOCATION
+# is a Memcached server ('host:port', comma separated for several). Without
+# it, the cache is local to the process, which only suits a single one such
+# as runserver; the production profile refuses to start that way.
+CACHE_LOCATION = [
+    server
+    for server in os.environ.get('DJANGO_CACHE_LOCATION', '').split(',')
+    if server
+]
+if PRODUCTION and not CACHE_LOCATION:
+    raise ImproperlyConfigured(
+        'The production profile needs a cache shared by all processes, '
+        'set DJANGO_CACHE_LOCATION.'
+    )
+
+# Counts the hits and misses of the availability cache for
+# 'manage.py availability_cache_stats'. Off by default, since counting
+# costs a cache round trip or two on every lookup.
+AVAILABILITY_CACHE_STATS = os.environ.get(
+    'DJANGO_AVAILABILITY_CACHE_STATS', 'false'
+).lower() == 'true'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_LOCATION,
+    } if CACHE_LOCATION else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            # Two entries per table for the day, with room for the users
+            # and older versions. The default of 300 evicts them all.
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
 #rest_framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+        'users.authentication.CachedBasicAuthentication',
+    ) + (() if API_ONLY else (
         'rest_framework.authentication.SessionAuthentication',
-    ),
-    # 'DEFAULT_RENDERER_CLASSES': (
-    #     # 'rest_framework.renderers.JSONRenderer',
-    #     'rest_framework.renderers.BrowsableAPIRenderer', #TODO
-    # ),
+    )),
+    # Same bytes as DRF's JSONRenderer, the browsable API outside production
+    'DEFAULT_RENDERER_CLASSES': (
+        'restaurant.renderers.FastJSONRenderer',
+    ) + (() if PRODUCTION else (
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -148,4 +277,27 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'core.logging.JSONFormatter',
+        },
+        'simple': {
+            'format': '{levelname} {name}: {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json' if PRODUCTION else 'simple',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO'),
+    },
+}
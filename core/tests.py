@@ -0,0 +1,115 @@
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from unittest import skipUnless
+import time
+from core.backends.postgresql.base import (
+    ConnectionPool, Database, DatabaseWrapper
+)
+from core.checks import check_connection_pool, check_production_settings
+
+
+class FakeConnection:
+    closed = 0
+    status = Database.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.status = Database.extensions.STATUS_READY
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def test_reuses_returned_connections(self):
+        pool = ConnectionPool(size=2, max_idle=60, timeout=0)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        self.assertIs(pool.get(FakeConnection), connection)
+
+    def test_size_limit(self):
+        pool = ConnectionPool(size=1, max_idle=60, timeout=0)
+        connection = pool.get(FakeConnection)
+        with self.assertRaises(Database.OperationalError):
+            pool.get(FakeConnection)
+        pool.put(connection)
+        self.assertIs(pool.get(FakeConnection), connection)
+
+    def test_discards_idle_and_unusable_connections(self):
+        pool = ConnectionPool(size=2, max_idle=0.001, timeout=0)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        time.sleep(0.01)
+        self.assertIsNot(pool.get(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+
+        pool = ConnectionPool(size=2, max_idle=60, timeout=0)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        self.assertIsNot(
+            pool.get(FakeConnection, lambda connection: False), connection
+        )
+        self.assertTrue(connection.closed)
+
+    def test_rolls_back_open_transactions(self):
+        pool = ConnectionPool(size=1, max_idle=60, timeout=0)
+        connection = pool.get(FakeConnection)
+        connection.status = Database.extensions.STATUS_IN_TRANSACTION
+        pool.put(connection)
+        self.assertEqual(
+            pool.get(FakeConnection).status,
+            Database.extensions.STATUS_READY
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Connects to PostgreSQL')
+class HealthCheckTests(SimpleTestCase):
+
+    def test_new_connections_are_not_checked(self):
+        wrapper = DatabaseWrapper(
+            dict(connection.settings_dict, CONN_HEALTH_CHECKS=True),
+            'health-check'
+        )
+        wrapper.ensure_connection()
+        try:
+            self.assertTrue(wrapper.health_check_done)
+            # No check query left a transaction open
+            self.assertEqual(
+                wrapper.connection.status, Database.extensions.STATUS_READY
+            )
+        finally:
+            wrapper.close()
+
+
+class ProductionChecksTests(SimpleTestCase):
+
+    def test_silent_outside_production(self):
+        with override_settings(PRODUCTION=False, DEBUG=True):
+            self.assertEqual(check_production_settings(None), [])
+
+    def test_warns_about_debug_and_browsable_api(self):
+        with override_settings(
+                PRODUCTION=True,
+                DEBUG=True,
+                REST_FRAMEWORK={'DEFAULT_RENDERER_CLASSES': (
+                    'rest_framework.renderers.BrowsableAPIRenderer',
+                )}):
+            ids = {
+                warning.id for warning in check_production_settings(None)
+            }
+        self.assertTrue({'core.W001', 'core.W002'} <= ids)
+
+    def test_pool_has_room_for_the_async_view_threads(self):
+        databases = {'default': dict(
+            connection.settings_dict, POOL={'SIZE': 8}
+        )}
+        with override_settings(
+                ASYNC_VIEWS=True, ASYNC_VIEW_THREADS=8, DATABASES=databases):
+            ids = [warning.id for warning in check_connection_pool(None)]
+        self.assertEqual(ids, ['core.W006'])
+        with override_settings(
+                ASYNC_VIEWS=True, ASYNC_VIEW_THREADS=7, DATABASES=databases):
+            self.assertEqual(check_connection_pool(None), [])
+        with override_settings(
+                ASYNC_VIEWS=False, ASYNC_VIEW_THREADS=8, DATABASES=databases):
+            self.assertEqual(check_connection_pool(None), [])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_yasg.views import get_schema_view
@@ -20,7 +21,6 @@ schema_view = get_schema_view(
 
 
 urlpatterns = [
-   path('admin/', admin.site.urls),
    path('api/', include('users.urls', namespace='users')),
    path('api/', include('restaurant.urls', namespace='restaurant')),
    path(
@@ -29,3 +29,6 @@ urlpatterns = [
       name='schema-swagger-ui'
    ),
 ]
+
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    urlpatterns.append(path('admin/', admin.site.urls))
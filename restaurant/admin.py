@@ -1,5 +1,5 @@
 from django.contrib import admin
-from restaurant.models import Table, Reservation
+from restaurant.models import Table, Reservation, ArchivedReservation
 
 
 @admin.register(Table)
@@ -12,3 +12,9 @@ class TableAdmin(admin.ModelAdmin):
 class ReservationAdmin(admin.ModelAdmin):
     list_display = ['table', 'start_time', 'end_time']
     list_filter = ['table']
+
+
+@admin.register(ArchivedReservation)
+class ArchivedReservationAdmin(admin.ModelAdmin):
+    list_display = ['table_number', 'start_time', 'end_time']
+    list_filter = ['table_number']
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.utils import timezone
+from restaurant.models import Reservation, ArchivedReservation
+from restaurant.signals import (
+    mute_reservation_signals, reservations_changed
+)
+
+
+def archive_reservations(queryset, batch_size=1000):
+    # Moves the reservations to ArchivedReservation a batch at a time, so
+    # neither memory nor the transactions grow with the history.
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(queryset.order_by('pk').values_list(
+                'pk', 'table_id', 'table__number', 'start_time', 'end_time'
+            )[:batch_size])
+            if not batch:
+                return archived
+            ArchivedReservation.objects.bulk_create(
+                ArchivedReservation(
+                    table_number=table_number,
+                    start_time=start_time,
+                    end_time=end_time
+                )
+                for _, _, table_number, start_time, end_time in batch
+            )
+            # The cache is told once per table-day instead of once for
+            # every reservation
+            with mute_reservation_signals():
+                Reservation.objects.filter(
+                    pk__in=[pk for pk, _, _, _, _ in batch]
+                ).delete()
+            for table_id, day in {
+                (table_id, timezone.localtime(start_time).date())
+                for _, table_id, _, start_time, _ in batch
+            }:
+                reservations_changed(table_id, day)
+        archived += len(batch)
@@ -0,0 +1,68 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+
+# The endpoints on the hot path of the ASGI deployment
+ASYNC_ROUTES = (
+    'table-check-available-slots',
+    'reservation-list',
+    'reservation-today-reservations',
+)
+
+# Sized by a setting, so that core.checks can tell whether the database
+# connection pool has room for all of its threads
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS, thread_name_prefix='async-views'
+)
+
+
+def database_sync_to_async(func):
+    """
+    Runs func in the thread pool of the async views, closing stale database
+    connections around it like Django does around every request.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=executor)
+
+
+def thread_pool_view(view):
+    # Under ASGI, Django 3.2 runs every sync view in one shared thread, so
+    # each request waits for the queries of all the others. Without an
+    # async ORM, the view is awaited from the thread pool instead; each
+    # pool thread keeps its own database connection.
+    def render(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            # Otherwise Django renders it back in the shared thread
+            response.render()
+        return response
+
+    run = database_sync_to_async(render)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run(request, *args, **kwargs)
+    return async_view
+
+
+def thread_pool_routes(urlpatterns, names=ASYNC_ROUTES):
+    # Same URLs, names and views, only awaited
+    return [
+        URLPattern(
+            pattern.pattern,
+            thread_pool_view(pattern.callback),
+            pattern.default_args,
+            pattern.name
+        ) if pattern.name in names else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,266 @@
+import functools
+import heapq
+import itertools
+import logging
+import math
+
+
+logger = logging.getLogger(__name__)
+
+
+def format_time(seconds):
+    # Same output as strftime('%I:%M %p') for a number of seconds since
+    # midnight, without going through datetime parsing.
+    minutes = int(seconds) // 60
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    period = 'AM' if hour < 12 else 'PM'
+    return f'{hour % 12 or 12:02d}:{minute:02d} {period}'
+
+
+class AvailabilityIndex:
+    """
+    Free time of a set of tables for one day, one bitmap per table.
+
+    Bit i of a table's bitmap is set while the minute starting i minutes
+    after opening is free, so booking and cancelling are bit operations
+    and finding the tables free for a block of time is a bitwise AND per
+    table. Times are seconds since midnight, truncated to the minute.
+    """
+
+    def __init__(self, opening, closing, tables):
+        self.opening = int(opening) // 60
+        self.size = int(closing) // 60 - self.opening
+        self.full = (1 << self.size) - 1
+        self.tables = [(table.pk, table.num_of_seats) for table in tables]
+        self.seats = dict(self.tables)
+        self.bitmaps = {pk: self.full for pk, _ in self.tables}
+
+    def mask(self, start, end):
+        # Bits of the minutes from start up to, but excluding, end
+        first = int(min(start, end)) // 60 - self.opening
+        last = int(max(start, end)) // 60 - self.opening
+        first, last = max(first, 0), min(last, self.size)
+        if first >= last:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def contains(self, start, end):
+        first = int(min(start, end)) // 60
+        last = int(max(start, end)) // 60
+        return self.opening <= first and last <= self.opening + self.size
+
+    def book(self, pk, start, end):
+        self.bitmaps[pk] &= ~self.mask(start, end)
+
+    def cancel(self, pk, start, end):
+        # Reservations of a table never overlap, so the minutes are free
+        # again once the reservation holding them is cancelled.
+        self.bitmaps[pk] |= self.mask(start, end)
+
+    def is_free(self, pk, start, end):
+        mask = self.mask(start, end)
+        return self.contains(start, end) and self.bitmaps[pk] & mask == mask
+
+    def free_tables(self, num_of_seats, start, end):
+        if not self.contains(start, end):
+            return []
+        mask = self.mask(start, end)
+        return [
+            pk for pk, seats in self.tables
+            if seats >= num_of_seats and self.bitmaps[pk] & mask == mask
+        ]
+
+    def enclosing_run(self, pk, start, end):
+        # (start, end) minutes since opening of the block of free time
+        # holding the minutes from start up to end, which must be free
+        first = int(start) // 60 - self.opening
+        last = int(end) // 60 - self.opening
+        bitmap = self.bitmaps[pk]
+        run_start = (~bitmap & ((1 << first) - 1)).bit_length()
+        shifted = bitmap >> last
+        return run_start, last + (~shifted & (shifted + 1)).bit_length() - 1
+
+    def best_tables(self, num_of_seats, start, end):
+        """
+        Yields the tables free from start to end, best fit first: fewest
+        empty seats, then fewest leftover gaps too short for a booking as
+        long, then the tightest block of free time.
+        """
+        first = int(start) // 60 - self.opening
+        last = int(end) // 60 - self.opening
+        heap = []
+        for pk in self.free_tables(num_of_seats, start, end):
+            run_start, run_end = self.enclosing_run(pk, start, end)
+            gaps = (first - run_start, run_end - last)
+            heapq.heappush(heap, (
+                self.seats[pk] - num_of_seats,
+                sum(0 < gap < last - first for gap in gaps),
+                sum(gaps),
+                pk
+            ))
+        while heap:
+            yield heapq.heappop(heap)[-1]
+
+    def combinations(self, num_of_seats, start=None, end=None,
+                     max_tables=4, limit=10, max_steps=20000):
+        """
+        Sets of at most max_tables tables with enough seats between them,
+        none to spare, and free time in common (the whole block from start
+        to end, when given), fewest empty seats first, then fewest tables.
+
+        Branch and bound over groups of tables with the same seats and
+        free time, largest first. A branch is cut once the fewest empty
+        seats its remaining tables could leave can't beat the worst of the
+        best combinations so far. After max_steps tables tried, the best
+        combinations found by then are returned, and a warning is logged
+        since they may not be the best ones.
+        """
+        if start is not None and not self.contains(start, end):
+            return []
+        mask = 0 if start is None else self.mask(start, end)
+        groups = {}
+        for pk, seats in self.tables:
+            bitmap = self.bitmaps[pk]
+            if bitmap and bitmap & mask == mask:
+                groups.setdefault((seats, bitmap), []).append(pk)
+        groups = sorted(groups.items(), key=lambda group: -group[0][0])
+        sizes = sorted({seats for (seats, _), _ in groups}, reverse=True)
+        # Tables of each size, at most max_tables of them count
+        counts = [
+            min(sum(len(pks) for (seats, _), pks in groups if seats == size),
+                max_tables)
+            for size in sizes
+        ]
+        position = {size: i for i, size in enumerate(sizes)}
+        # The worst of the best combinations so far on top
+        best = []
+        steps = [max_steps]
+
+        @functools.lru_cache(maxsize=None)
+        def fewest_seats(first, left, need):
+            # Fewest seats from at most left tables of sizes[first:] that
+            # seat need people, whatever their free time
+            if need <= 0:
+                return 0
+            if not left or first == len(sizes):
+                return math.inf
+            size = sizes[first]
+            fewest = fewest_seats(first + 1, left, need)
+            for count in range(1, min(counts[first], left) + 1):
+                if size * count >= need:
+                    return min(fewest, size * count)
+                fewest = min(fewest, size * count + fewest_seats(
+                    first + 1, left - count, need - size * count
+                ))
+            return fewest
+
+        def beats(rank):
+            return len(best) < limit or rank < _worse(best[0][0])
+
+        def picks(chosen):
+            if not chosen:
+                yield []
+                return
+            (i, count), rest = chosen[0], chosen[1:]
+            for pks in itertools.combinations(groups[i][1], count):
+                for others in picks(rest):
+                    yield list(pks) + others
+
+        def keep(rank, chosen):
+            # Every way to pick the tables of the chosen groups ranks the
+            # same, no more than limit of them can be kept
+            for pks in itertools.islice(picks(chosen), limit):
+                if not beats(rank):
+                    return
+                entry = (_worse(rank), pks)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heapreplace(best, entry)
+
+        def search(first, seats, bitmap, chosen, tables):
+            need = num_of_seats - seats
+            for i in range(first, len(groups)):
+                steps[0] -= 1
+                if steps[0] < 0:
+                    return
+                (table_seats, table_bitmap), pks = groups[i]
+                size = position[table_seats]
+                # The fewest empty seats tables of this size or smaller
+                # could leave, with one more table or more. The rest of
+                # the groups are no bigger, so can't do any better.
+                left = max_tables - tables
+                finish = (fewest_seats(size, 1, need) - need, tables + 1)
+                extend = (fewest_seats(size, left, need) - need, tables + 2)
+                if not beats(extend):
+                    if not beats(finish):
+                        return
+                    # Only one more table is worth adding
+                    left = 1
+                # The rest have no more seats, so can't fill the party
+                if table_seats * left < need:
+                    return
+                common = bitmap & table_bitmap
+                if not common or common & mask != mask:
+                    continue
+                for count in range(1, min(len(pks), left) + 1):
+                    total = seats + table_seats * count
+                    if total >= num_of_seats:
+                        keep(
+                            (total - num_of_seats, tables + count),
+                            chosen + [(i, count)]
+                        )
+                        break
+                    if count < left:
+                        search(
+                            i + 1, total, common, chosen + [(i, count)],
+                            tables + count
+                        )
+
+        search(0, 0, self.full, [], 0)
+        if steps[0] < 0:
+            logger.warning(
+                'Stopped searching combinations of tables for %d after %d '
+                'steps, the ones found so far may not be the best.',
+                num_of_seats, max_steps
+            )
+        return [
+            (_worse(rank)[0], pks)
+            for rank, pks in sorted(best, key=lambda entry: _worse(entry[0]))
+        ]
+
+    def common_runs(self, pks):
+        bitmap = self.full
+        for pk in pks:
+            bitmap &= self.bitmaps[pk]
+        return _runs(bitmap)
+
+    def runs(self, pk):
+        # (start, end) minutes since opening of every block of free time
+        return _runs(self.bitmaps[pk])
+
+    def format_runs(self, runs):
+        return [
+            f'{format_time((self.opening + start) * 60)} - '
+            f'{format_time((self.opening + end) * 60)}'
+            for start, end in runs
+        ]
+
+    def slots(self, pk):
+        return self.format_runs(self.runs(pk))
+
+
+def _worse(rank):
+    # Negated, so that heapq keeps the worst rank on top
+    return tuple(-key for key in rank)
+
+
+def _runs(bitmap):
+    runs = []
+    while bitmap:
+        start = (bitmap & -bitmap).bit_length() - 1
+        shifted = bitmap >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        runs.append((start, start + length))
+        bitmap &= ~(((1 << length) - 1) << start)
+    return runs
@@ -0,0 +1,400 @@
+import datetime
+import functools
+import timeit
+import tracemalloc
+from restaurant.local_requirements.interval import Interval
+from restaurant.local_requirements.legacy_interval import (
+    Interval as LegacyInterval
+)
+
+
+def legacy_reformat(time):
+    return datetime.datetime.strptime(
+        time, '%I:%M %p'
+    ).strftime('%H:%M %p')
+
+
+def legacy_check_time_between(time, intervals):
+    # The create-time check before the numeric containment test: parse
+    # every free slot string and compare '%H:%M %p' strings.
+    times = [
+        tuple(legacy_reformat(time) for time in i.split(' - '))
+        for i in intervals
+    ]
+    for lower, upper in times:
+        if lower <= time[0] <= upper and lower <= time[1] <= upper:
+            return True
+    return False
+
+
+def sample_bounds(count):
+    # Reservation-like bounds: seconds since midnight during opening hours
+    return [
+        (46800.0 + (i * 397) % 39000, 46800.0 + (i * 397) % 39000 + 5400.0)
+        for i in range(count)
+    ]
+
+
+def measure_memory(factory, bounds):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(lower, upper) for lower, upper in bounds]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return size / len(bounds)
+
+
+def report(stdout, title, legacy, current, unit):
+    stdout.write(
+        f'{title:<28}{legacy:>14.2f}{current:>14.2f} {unit:<6}'
+        f'{legacy / current:>8.1f}x'
+    )
+
+
+def interval_suite(stdout, options):
+    count = options['number']
+    bounds = sample_bounds(count)
+    stdout.write(f'{count} intervals{"legacy":>20}{"current":>14}')
+
+    legacy = measure_memory(LegacyInterval, bounds)
+    current = measure_memory(Interval, bounds)
+    report(stdout, 'memory per interval', legacy, current, 'bytes')
+
+    legacy = min(timeit.repeat(
+        lambda: [LegacyInterval(lower, upper) for lower, upper in bounds],
+        number=1, repeat=5
+    ))
+    current = min(timeit.repeat(
+        lambda: [Interval(lower, upper) for lower, upper in bounds],
+        number=1, repeat=5
+    ))
+    report(stdout, 'construction', legacy * 1e9 / count,
+           current * 1e9 / count, 'ns')
+
+    legacy_intervals = [
+        LegacyInterval(lower, upper) for lower, upper in bounds
+    ]
+    intervals = [Interval(lower, upper) for lower, upper in bounds]
+    # The legacy class has no __lt__ under Python 3, sorted() raises
+    # TypeError for it (and IntervalSet used to swallow it, leaving its
+    # intervals unsorted). It's sorted through its __cmp__ instead.
+    legacy_key = functools.cmp_to_key(LegacyInterval.__cmp__)
+    legacy = min(timeit.repeat(
+        lambda: sorted(legacy_intervals, key=legacy_key), number=1, repeat=5
+    ))
+    current = min(timeit.repeat(
+        lambda: sorted(intervals), number=1, repeat=5
+    ))
+    report(stdout, 'sorted(), legacy by __cmp__', legacy * 1e3,
+           current * 1e3, 'ms')
+
+    pairs = list(zip(intervals, intervals[1:]))
+    legacy_pairs = list(zip(legacy_intervals, legacy_intervals[1:]))
+    legacy = min(timeit.repeat(
+        lambda: [a.__cmp__(b) < 0 for a, b in legacy_pairs],
+        number=1, repeat=5
+    ))
+    current = min(timeit.repeat(
+        lambda: [a < b for a, b in pairs], number=1, repeat=5
+    ))
+    report(stdout, 'ordering comparison', legacy * 1e9 / len(pairs),
+           current * 1e9 / len(pairs), 'ns')
+
+
+def allocation_suite(stdout, options):
+    from django.conf import settings
+    from restaurant.availability import AvailabilityIndex
+    from restaurant.cache import get_reservation_times
+    from restaurant.models import Table
+    tables = [
+        Table(pk=pk, num_of_seats=2 + pk % 7)
+        for pk in range(max(options['number'] // 100, 1))
+    ]
+    times = {table.pk: [] for table in tables}
+    for pk, (lower, upper) in zip(
+            range(len(tables) * 3), sample_bounds(len(tables) * 3)):
+        times[pk % len(tables)].append((lower, upper))
+    # A day no reservation is on, so the cached times are these ones
+    day = datetime.date(2000, 1, 1)
+
+    def build_index():
+        # What every request does before looking anything up: fetch the
+        # day's reservation times from the cache and book them
+        index = AvailabilityIndex(46800, 86340, tables)
+        for pk, booked in get_reservation_times(
+                list(times), day, lambda pks, day: times).items():
+            for start, end in booked:
+                index.book(pk, start, end)
+        return index
+
+    index = build_index()
+    stdout.write(f'{len(tables)} tables{"slot lists":>23}{"best fit":>14}')
+
+    def slot_lists(index):
+        # What check-available-slots answers for the host to pick from
+        return [
+            index.slots(pk)
+            for pk in index.free_tables(4, 68400, 73800)
+        ]
+
+    def best_table(index):
+        return next(index.best_tables(4, 68400, 73800), None)
+
+    legacy = min(timeit.repeat(
+        lambda: slot_lists(index), number=100, repeat=5
+    )) / 100
+    current = min(timeit.repeat(
+        lambda: best_table(index), number=100, repeat=5
+    )) / 100
+    report(stdout, 'pick a table for 4', legacy * 1e6, current * 1e6, 'us')
+    # The index isn't kept between requests, so this is what a request
+    # costs, less the queries for the tables
+    legacy = min(timeit.repeat(
+        lambda: slot_lists(build_index()), number=100, repeat=5
+    )) / 100
+    current = min(timeit.repeat(
+        lambda: best_table(build_index()), number=100, repeat=5
+    )) / 100
+    report(stdout, 'per request, index built', legacy * 1e6,
+           current * 1e6, 'us')
+    backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+    stdout.write(f'  (times read from {backend})')
+
+
+def combinations_suite(stdout, options):
+    import random
+    from restaurant.availability import AvailabilityIndex
+    from restaurant.models import Table
+    # A large floor of two to twelve seat tables, seated parties of even
+    # size, so that odd parties always leave an empty seat.
+    rng = random.Random(0)
+    tables = [
+        Table(pk=pk, num_of_seats=rng.choice((2, 4, 6, 8, 10, 12)))
+        for pk in range(300)
+    ]
+    free = AvailabilityIndex(46800, 86340, tables)
+    booked = AvailabilityIndex(46800, 86340, tables)
+    for table in tables:
+        for _ in range(5):
+            start = rng.randrange(46800, 82800, 900)
+            booked.book(table.pk, start, start + rng.choice((3600, 7200)))
+    stdout.write(f'{len(tables)} tables{"free":>23}{"booked":>14}')
+
+    def run(index, *args):
+        return min(timeit.repeat(
+            lambda: index.combinations(*args), number=1, repeat=5
+        ))
+
+    for num_of_seats in (13, 25, 37, 48):
+        for bounds in ((), (68400, 75600)):
+            title = f'party of {num_of_seats}'
+            if bounds:
+                title += ', 7 PM to 9 PM'
+            stdout.write(
+                f'{title:<28}{run(free, num_of_seats, *bounds) * 1e3:>14.2f}'
+                f'{run(booked, num_of_seats, *bounds) * 1e3:>14.2f} ms'
+            )
+
+
+def create_suite(stdout, options):
+    from restaurant.utils import (
+        free_intervals, fits_free_slot, humanize_intervals
+    )
+    count = options['number']
+    reservations = [
+        Interval(lower, upper) for lower, upper in sample_bounds(8)
+    ]
+    requests = [
+        (datetime.time(13 + i % 11, i * 7 % 60),
+         datetime.time(13 + (i + 2) % 11, i * 13 % 60))
+        for i in range(count)
+    ]
+    stdout.write(f'{count} creates{"legacy":>22}{"current":>14}')
+
+    def legacy_create():
+        for start_time, end_time in requests:
+            legacy_check_time_between(
+                (start_time.strftime('%H:%M %p'),
+                 end_time.strftime('%H:%M %p')),
+                humanize_intervals(free_intervals(reservations))
+            )
+
+    def create():
+        for start_time, end_time in requests:
+            fits_free_slot(free_intervals(reservations), start_time, end_time)
+
+    legacy = min(timeit.repeat(legacy_create, number=1, repeat=5))
+    current = min(timeit.repeat(create, number=1, repeat=5))
+    report(stdout, 'slot validation', legacy * 1e6 / count,
+           current * 1e6 / count, 'us')
+
+
+def serialization_suite(stdout, options):
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from restaurant.models import Table, Reservation
+    from restaurant.renderers import FastJSONRenderer
+    from restaurant.serializers import ReservationDetailSerializer
+    from restaurant.utils import reservation_rows
+    count = options['number']
+    tables = [Table(pk=number, number=number) for number in range(1, 31)]
+    day = timezone.make_aware(datetime.datetime(2021, 9, 10))
+    reservations = [
+        Reservation(
+            pk=pk,
+            table=tables[pk % len(tables)],
+            start_time=day + datetime.timedelta(seconds=lower),
+            end_time=day + datetime.timedelta(seconds=upper)
+        )
+        for pk, (lower, upper) in enumerate(sample_bounds(count), 1)
+    ]
+    # What values() returns for the same reservations
+    values = [
+        {
+            'pk': reservation.pk,
+            'table__number': reservation.table.number,
+            'start_time': reservation.start_time,
+            'end_time': reservation.end_time
+        }
+        for reservation in reservations
+    ]
+    stdout.write(f'{count} reservations{"serializer":>19}{"rows":>14}')
+
+    def legacy():
+        return JSONRenderer().render(
+            ReservationDetailSerializer(reservations, many=True).data
+        )
+
+    def current():
+        return FastJSONRenderer().render(reservation_rows(values))
+
+    if legacy() != current():
+        raise AssertionError('The outputs differ.')
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=5))
+    current_time = min(timeit.repeat(current, number=1, repeat=5))
+    report(stdout, f'render {count} rows', legacy_time * 1e3,
+           current_time * 1e3, 'ms')
+    report(stdout, 'time per row', legacy_time * 1e6 / count,
+           current_time * 1e6 / count, 'us')
+
+
+def connections_suite(stdout, options):
+    from django.db import connection
+    from django.db.utils import load_backend
+    if connection.vendor != 'postgresql':
+        stdout.write('The connections suite needs a PostgreSQL database.')
+        return
+    count = options['number']
+    stdout.write(f'{count} requests{"no pool":>21}{"pool":>14}')
+    modes = {
+        'new connections': {'CONN_MAX_AGE': 0, 'POOL': None},
+        'persistent': {'CONN_MAX_AGE': 60, 'POOL': None},
+        'pool': {'CONN_MAX_AGE': 0, 'POOL': {'SIZE': 4}},
+    }
+
+    def requests_per_second(mode):
+        settings_dict = dict(connection.settings_dict, **modes[mode])
+        backend = load_backend('core.backends.postgresql')
+        wrapper = backend.DatabaseWrapper(settings_dict, 'benchmark')
+
+        def request():
+            # What Django does around every request
+            wrapper.close_if_unusable_or_obsolete()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            wrapper.close_if_unusable_or_obsolete()
+        elapsed = timeit.timeit(request, number=count)
+        wrapper.close()
+        return count / elapsed
+
+    pool = requests_per_second('pool')
+    for mode in ('new connections', 'persistent'):
+        rate = requests_per_second(mode)
+        stdout.write(
+            f'{mode + " (req/s)":<28}{rate:>14.0f}{pool:>14.0f}'
+            f'{pool / rate:>15.1f}x'
+        )
+
+
+def load_suite(stdout, options):
+    import http.client
+    import json
+    import threading
+    import urllib.parse
+    from concurrent.futures import ThreadPoolExecutor
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+    urls = options['url']
+    if not urls:
+        stdout.write(
+            'The load suite needs running servers, e.g. '
+            '--url http://127.0.0.1:8000 --url http://127.0.0.1:8001'
+        )
+        return
+    admin = get_user_model().objects.filter(
+        role='Admin', is_active=True
+    ).first()
+    if admin is None:
+        stdout.write('The load suite needs an active admin user.')
+        return
+    count = options['number']
+    concurrency = options['concurrency']
+    headers = {
+        'Authorization': f'Bearer {AccessToken.for_user(admin)}',
+        'Content-Type': 'application/json',
+    }
+    # Staff checking today's bookings and the free slots for walk-ins
+    workload = [
+        ('GET', '/api/reservations/today-reservations/', None),
+        ('POST', '/api/tables/check-available-slots/',
+         json.dumps({'num_of_seats': '2'})),
+    ]
+    stdout.write(
+        f'{count} requests, {concurrency} concurrent'
+        f'{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}'
+    )
+
+    def run(url):
+        target = urllib.parse.urlsplit(url)
+        local = threading.local()
+
+        def request(i):
+            if not hasattr(local, 'connection'):
+                # Keep-alive, one connection per client like a browser
+                local.connection = http.client.HTTPConnection(
+                    target.hostname, target.port, timeout=60
+                )
+            method, path, body = workload[i % len(workload)]
+            start = timeit.default_timer()
+            local.connection.request(method, path, body, headers)
+            response = local.connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise AssertionError(f'{method} {path}: {response.status}')
+            return timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        with ThreadPoolExecutor(concurrency) as executor:
+            latencies = sorted(executor.map(request, range(count)))
+        elapsed = timeit.default_timer() - start
+        stdout.write(
+            f'{url:<36}{count / elapsed:>10.0f}'
+            f'{latencies[len(latencies) // 2] * 1e3:>10.1f}'
+            f'{latencies[int(len(latencies) * 0.99)] * 1e3:>10.1f}'
+        )
+
+    for url in urls:
+        run(url)
+
+
+SUITES = {
+    'allocation': allocation_suite,
+    'combinations': combinations_suite,
+    'connections': connections_suite,
+    'create': create_suite,
+    'load': load_suite,
+    'serialization': serialization_suite,
+    'intervals': interval_suite,
+}
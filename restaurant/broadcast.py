@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+from restaurant.models import Table
+from restaurant.utils import availability_index
+
+
+class LocalBroadcast:
+    """
+    Delivers availability changes to the streams of this process.
+
+    A backend has active(), publish(message), and subscribe() and
+    unsubscribe(queue) called from the event loop; deployments running
+    more than one process plug in one that relays messages between them.
+    A subscriber that lets max_queued messages pile up is dropped, and
+    finds None in its queue instead of them.
+    """
+
+    max_queued = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def active(self):
+        return bool(self.subscribers)
+
+    def subscribe(self):
+        queue = asyncio.Queue(self.max_queued)
+        with self.lock:
+            self.subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            self.subscribers.pop(queue, None)
+
+    def publish(self, message):
+        # Called from the threads that save reservations
+        with self.lock:
+            subscribers = list(self.subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.deliver, queue, message)
+            except RuntimeError:
+                # The loop of a stream that didn't unsubscribe was closed
+                self.unsubscribe(queue)
+
+    def deliver(self, queue, message):
+        # In the subscriber's event loop
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client too slow to keep up would hold every message from
+            # now on; it has to start over from a new snapshot instead
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+
+@functools.lru_cache(maxsize=None)
+def load_backend(path):
+    return import_string(path)()
+
+
+def get_broadcast():
+    return load_backend(settings.AVAILABILITY_BROADCAST_BACKEND)
+
+
+def publish_table(table, deleted=False):
+    broadcast = get_broadcast()
+    # Nobody listens while the stands poll or are closed
+    if not broadcast.active():
+        return
+    broadcast.publish({
+        'number': table.number,
+        'num_of_seats': table.num_of_seats,
+        'slots': [] if deleted else availability_index([table]).slots(table.pk)
+    })
+
+
+def publish_table_pk(pk):
+    if get_broadcast().active():
+        table = Table.objects.filter(pk=pk).first()
+        # Reservations deleted along with their table
+        if table is not None:
+            publish_table(table)
@@ -0,0 +1,109 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+# Reservation times of a table are only looked up on the day itself
+CACHE_TIMEOUT = 60 * 60 * 24
+HITS_KEY = 'availability:hits'
+MISSES_KEY = 'availability:misses'
+TABLES_KEY = 'availability:tables:version'
+
+
+def version_key(pk, day):
+    return f'availability:version:{pk}:{day.isoformat()}'
+
+
+def data_key(pk, day, version):
+    return f'availability:{pk}:{day.isoformat()}:{version}'
+
+
+def day_key(day):
+    return f'availability:reservations:version:{day.isoformat()}'
+
+
+def versions(pks, day):
+    keys = {pk: version_key(pk, day) for pk in pks}
+    found = cache.get_many(keys.values())
+    # A table-day without a version gets a fresh one, so that entries
+    # cached under an evicted or expired version can never be read again.
+    new = {keys[pk]: uuid.uuid4().hex for pk in pks if keys[pk] not in found}
+    if new:
+        cache.set_many(new, CACHE_TIMEOUT)
+        found.update(new)
+    return {pk: found[key] for pk, key in keys.items()}
+
+
+def count(key, delta):
+    if delta and not cache.add(key, delta, None):
+        cache.incr(key, delta)
+
+
+def get_reservation_times(pks, day, load):
+    keys = {
+        pk: data_key(pk, day, version)
+        for pk, version in versions(pks, day).items()
+    }
+    cached = cache.get_many(keys.values())
+    times = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in pks if pk not in times]
+    if missing:
+        loaded = load(missing, day)
+        cache.set_many(
+            {keys[pk]: loaded[pk] for pk in missing}, CACHE_TIMEOUT
+        )
+        times.update(loaded)
+    if settings.AVAILABILITY_CACHE_STATS:
+        count(HITS_KEY, len(pks) - len(missing))
+        count(MISSES_KEY, len(missing))
+    return times
+
+
+def last_change(key):
+    # The version of the last change recorded under the key
+    version = cache.get(key)
+    if version is None:
+        # Unknown since the cache was emptied, assume it just changed
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def now_and_on_commit(func):
+    func()
+    if transaction.get_connection().in_atomic_block:
+        # Readers may cache the uncommitted state until the commit
+        transaction.on_commit(func)
+
+
+def invalidate(pk, day):
+    # The table-day's cached reservation times and the day's validators
+    def change():
+        cache.set(version_key(pk, day), uuid.uuid4().hex, CACHE_TIMEOUT)
+        cache.set(day_key(day), uuid.uuid4().hex, CACHE_TIMEOUT)
+    now_and_on_commit(change)
+
+
+def invalidate_tables():
+    now_and_on_commit(
+        lambda: cache.set(TABLES_KEY, uuid.uuid4().hex, CACHE_TIMEOUT)
+    )
+
+
+def is_shared():
+    # Whether other processes see the same cache
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {'hits': hits, 'misses': misses}
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
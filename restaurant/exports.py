@@ -0,0 +1,39 @@
+import csv
+import json
+from django.utils import timezone
+
+
+FIELDS = ('pk', 'table_number', 'start_time', 'end_time')
+
+
+class Echo:
+    # csv.writer only needs an object with a write() method
+    def write(self, value):
+        return value
+
+
+def export_row(pk, table_number, start_time, end_time):
+    return (
+        pk,
+        table_number,
+        timezone.localtime(start_time).isoformat(),
+        timezone.localtime(end_time).isoformat()
+    )
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, export_row(*row)))) + '\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow(export_row(*row))
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+    'csv': ('text/csv', csv_lines),
+}
@@ -97,6 +97,25 @@ class Smallest:
     else:
         retval = -1
     return retval
+
+  def __eq__(self, other):
+    "Python 3 equality, derived from __cmp__"
+    return self.__cmp__(other) == 0
+
+  def __ne__(self, other):
+    return self.__cmp__(other) != 0
+
+  def __lt__(self, other):
+    return self.__cmp__(other) < 0
+
+  def __le__(self, other):
+    return self.__cmp__(other) <= 0
+
+  def __gt__(self, other):
+    return self.__cmp__(other) > 0
+
+  def __ge__(self, other):
+    return self.__cmp__(other) >= 0
     
   def __str__(self):
       """Returns a printable representation of this value
@@ -177,6 +196,25 @@ class Largest:
         retval = 1
     return retval
 
+  def __eq__(self, other):
+    "Python 3 equality, derived from __cmp__"
+    return self.__cmp__(other) == 0
+
+  def __ne__(self, other):
+    return self.__cmp__(other) != 0
+
+  def __lt__(self, other):
+    return self.__cmp__(other) < 0
+
+  def __le__(self, other):
+    return self.__cmp__(other) <= 0
+
+  def __gt__(self, other):
+    return self.__cmp__(other) > 0
+
+  def __ge__(self, other):
+    return self.__cmp__(other) >= 0
+
   def __str__(self):
       """Returns a string representation of the object
       
@@ -203,6 +241,9 @@ class Largest:
 Inf = Largest()
 # Use -Inf for the smallest value      
 
+# Bound types taking the Interval fast path
+_NUMBERS = (int, float)
+
 class Interval:
     """Represents a continuous range of values
     
@@ -211,8 +252,13 @@ class Interval:
     are called lower_bound, lower_closed, upper_bound, and upper_closed,
     respectively.  For an infinite interval, the bound is set to inf or 
     -inf.  IntervalSets are composed of zero to many Intervals.
+
+    Intervals are immutable and hold no attributes besides their bounds,
+    so they are stored in slots rather than a per-instance __dict__.
     """
 
+    __slots__ = ('lower_bound', 'lower_closed', 'upper_bound', 'upper_closed')
+
     def __init__(self, lower_bound=-Inf, upper_bound=Inf, **kwargs):
         """Initializes an interval
         
@@ -273,6 +319,21 @@ class Interval:
         ...
         TypeError: upper_bound is not hashable.
         """
+        if type(lower_bound) in _NUMBERS and type(upper_bound) in _NUMBERS:
+            # Plain numbers are hashable and never unbound, so the checks
+            # below can be skipped
+            closed = kwargs.get("closed", True)
+            lower_closed = kwargs.get("lower_closed", closed)
+            upper_closed = kwargs.get("upper_closed", closed)
+            if upper_bound < lower_bound:
+                lower_bound, lower_closed, upper_bound, upper_closed = \
+                upper_bound, upper_closed, lower_bound, lower_closed
+            self.lower_bound = lower_bound
+            self.lower_closed = lower_closed
+            self.upper_bound = upper_bound
+            self.upper_closed = upper_closed
+            return
+
         try:
             h = hash(lower_bound)
         except TypeError:
@@ -305,6 +366,18 @@ class Interval:
         self.upper_bound  = upper_bound
         self.upper_closed = upper_closed
 
+    def __copy__(self):
+        """Returns the object itself, since Intervals are immutable
+
+        >>> r = Interval(3, 6)
+        >>> copy.deepcopy(r) is r
+        True
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __hash__(self):
         """Returns a hashed value of the object
         
@@ -413,6 +486,8 @@ class Interval:
         return self.lower_bound != self.upper_bound \
             or (self.upper_closed and self.lower_closed)
 
+    __bool__ = __nonzero__
+
     def __cmp__(self, other):
         """Compares two intervals for ordering purposes
         
@@ -438,6 +513,23 @@ class Interval:
         else:
             result = 1
         return result
+
+    def __lt__(self, other):
+        "Python 3 ordering, equivalent to __cmp__(other) < 0"
+        if self.lower_bound < other.lower_bound:
+            # Intervals with distinct lower bounds are only equal when
+            # both are empty
+            return bool(self) or bool(other)
+        return self.comes_before(other)
+
+    def __gt__(self, other):
+        return not (self == other or self.comes_before(other))
+
+    def __le__(self, other):
+        return self == other or self.comes_before(other)
+
+    def __ge__(self, other):
+        return not self.comes_before(other)
             
     def __and__(self, other):
         """Returns the intersection of two intervals
@@ -880,6 +972,185 @@ class Interval:
                 and self.upper_closed == other.upper_closed)
             
 
+def _lower_key(interval):
+    """Returns the ordering key of the lower boundary of an Interval
+
+    Boundaries are compared as (value, offset) pairs.  A closed boundary
+    sits on its value (offset 0), an open lower boundary sits just after
+    it (offset 1) and an open upper boundary just before it (offset -1).
+    Moving a boundary key by one offset step yields the boundary that
+    touches it from the other side, which is how adjacency is detected.
+
+    >>> _lower_key(Interval(2, 5)) < _lower_key(Interval(2, 5, closed=False))
+    True
+    """
+    if interval.lower_closed:
+        return (interval.lower_bound, 0)
+    return (interval.lower_bound, 1)
+
+
+def _upper_key(interval):
+    """Returns the ordering key of the upper boundary of an Interval
+
+    >>> _upper_key(Interval(2, 5, closed=False)) < _upper_key(Interval(2, 5))
+    True
+    """
+    if interval.upper_closed:
+        return (interval.upper_bound, 0)
+    return (interval.upper_bound, -1)
+
+
+def _from_keys(lower, upper):
+    "Returns the Interval spanning the lower and upper boundary keys"
+    return Interval(
+        lower[0], upper[0],
+        lower_closed=(lower[1] == 0), upper_closed=(upper[1] == 0))
+
+
+def _bisect_upper(intervals, key):
+    """Returns the index of the first Interval whose upper key is >= key
+
+    intervals must be sorted and disjoint, so that their upper keys are
+    sorted as well.
+
+    >>> _bisect_upper([Interval(0, 2), Interval(4, 6)], (3, 0))
+    1
+    """
+    lo, hi = 0, len(intervals)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _upper_key(intervals[mid]) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _bisect_lower(intervals, key, lo=0):
+    """Returns the index of the first Interval whose lower key is > key
+
+    >>> _bisect_lower([Interval(0, 2), Interval(4, 6)], (4, 0))
+    2
+    """
+    hi = len(intervals)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key < _lower_key(intervals[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _sweep_union(a, b):
+    """Merges two sorted lists of disjoint Intervals in a single pass
+
+    Both lists must be sorted by lower boundary, as the normalized
+    BaseIntervalSet.intervals are.  The result is normalized: sorted, with
+    overlapping and adjacent Intervals joined.
+
+    >>> _sweep_union([Interval(1, 3)], [Interval(3, 5, lower_closed=False)])
+    [Interval(1, 5, lower_closed=True, upper_closed=True)]
+    """
+    result = []
+    i = j = 0
+    current = lower = upper = None
+    while i < len(a) or j < len(b):
+        if j == len(b) or (
+                i < len(a) and _lower_key(a[i]) <= _lower_key(b[j])):
+            r = a[i]
+            i += 1
+        else:
+            r = b[j]
+            j += 1
+        r_lower, r_upper = _lower_key(r), _upper_key(r)
+        if lower is None:
+            current, lower, upper = r, r_lower, r_upper
+        elif r_lower <= (upper[0], upper[1] + 1):
+            if r_upper > upper:
+                upper = r_upper
+            current = None
+        else:
+            result.append(current or _from_keys(lower, upper))
+            current, lower, upper = r, r_lower, r_upper
+    if lower is not None:
+        result.append(current or _from_keys(lower, upper))
+    return result
+
+
+def _sweep_intersection(a, b):
+    """Intersects two sorted lists of disjoint Intervals in a single pass
+
+    >>> _sweep_intersection(
+    ...   [Interval(1, 3), Interval(5, 8)], [Interval(2, 6, closed=False)])
+    [Interval(2, 3, lower_closed=False, upper_closed=True), Interval(5, 6, lower_closed=True, upper_closed=False)]
+    """
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        a_lower, a_upper = _lower_key(a[i]), _upper_key(a[i])
+        b_lower, b_upper = _lower_key(b[j]), _upper_key(b[j])
+        lower = max(a_lower, b_lower)
+        upper = min(a_upper, b_upper)
+        if lower <= upper:
+            if lower == a_lower and upper == a_upper:
+                result.append(a[i])
+            elif lower == b_lower and upper == b_upper:
+                result.append(b[j])
+            else:
+                result.append(_from_keys(lower, upper))
+        if a_upper < b_upper:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _sweep_difference(a, b):
+    """Removes the Intervals of b from those of a in a single pass
+
+    Each Interval of a is cut by the Intervals of b that overlap it.  The
+    gap left before a removed Interval ends just before its lower
+    boundary, and the next piece starts just after its upper boundary.
+
+    >>> _sweep_difference([Interval(0, 10)], [Interval(2, 4), Interval(6, 8)])
+    [Interval(0, 2, lower_closed=True, upper_closed=False), Interval(4, 6, lower_closed=False, upper_closed=False), Interval(8, 10, lower_closed=False, upper_closed=True)]
+    """
+    result = []
+    j = 0
+    for r in a:
+        r_lower, r_upper = _lower_key(r), _upper_key(r)
+        while j < len(b) and _upper_key(b[j]) < r_lower:
+            j += 1
+        lower = r_lower
+        while j < len(b) and _lower_key(b[j]) <= r_upper:
+            b_lower, b_upper = _lower_key(b[j]), _upper_key(b[j])
+            if b_lower > lower:
+                result.append(
+                    _from_keys(lower, (b_lower[0], b_lower[1] - 1)))
+            if b_upper >= r_upper:
+                # b[j] may still overlap the next Interval of a
+                lower = None
+                break
+            lower = (b_upper[0], b_upper[1] + 1)
+            j += 1
+        if lower is not None and lower <= r_upper:
+            if lower == r_lower:
+                result.append(r)
+            else:
+                result.append(_from_keys(lower, r_upper))
+    return result
+
+
+def _sweep_symmetric_difference(a, b):
+    """Returns the Intervals found in exactly one of a and b
+
+    >>> _sweep_symmetric_difference([Interval(0, 4)], [Interval(2, 6)])
+    [Interval(0, 2, lower_closed=True, upper_closed=False), Interval(4, 6, lower_closed=False, upper_closed=True)]
+    """
+    return _sweep_difference(_sweep_union(a, b), _sweep_intersection(a, b))
+
+
 class BaseIntervalSet(object):
     "Base class for IntervalSet and FrozenIntervalSet."
     
@@ -917,13 +1188,16 @@ class BaseIntervalSet(object):
         ...   Interval.between(l, u) for l, u in [(10, 20), (30, 40)])
         [10..20],[30..40]
         """
-        self.intervals = []
+        intervals = []
         for i in items:
-            self._add(i)
-        try:
-            self.intervals.sort()
-        except Exception as e:
-            pass
+            if not isinstance(i, Interval):
+                i = Interval.equal_to(i)
+            if i:   # Don't bother adding an empty Interval
+                intervals.append(i)
+        # Sort once, then join overlapping and adjacent Intervals in a
+        # single pass
+        intervals.sort(key=_lower_key)
+        self.intervals = _sweep_union(intervals, [])
 
     def __len__(self):
         """Returns the number of intervals contained in the object
@@ -1226,12 +1500,12 @@ class BaseIntervalSet(object):
         >>> r in some
         True
         """
-        result = False                    
-        for r in self.intervals:
-            if obj in r:
-                result = True
-                break
-        return result
+        if not isinstance(obj, Interval):
+            obj = Interval.equal_to(obj)
+        # The Intervals are sorted and disjoint, so only the last one
+        # starting no later than obj can hold it
+        index = _bisect_lower(self.intervals, _lower_key(obj))
+        return index > 0 and obj in self.intervals[index - 1]
 
     def __iter__(self):
         """Returns an iterator over the intervals in the set
@@ -1332,41 +1606,12 @@ class BaseIntervalSet(object):
         TypeError: unsupported operand type(s) for -: expected BaseIntervalSet
         """
         if isinstance(other, BaseIntervalSet):
-            result = IntervalSet(self)
-            for j in other.intervals:
-                temp = IntervalSet()
-                for i in result.intervals:
-                    if i.overlaps(j):
-                        if i in j:
-                            pass
-                        elif j in i:
-                            if j.lower_bound != None:
-                                temp.add(Interval(
-                                    i.lower_bound, j.lower_bound, 
-                                    lower_closed=i.lower_closed, 
-                                    upper_closed=not j.lower_closed))
-                            if j.upper_bound != None:
-                                temp.add(Interval(
-                                    j.upper_bound, i.upper_bound, 
-                                    lower_closed=not j.upper_closed, 
-                                    upper_closed=i.upper_closed))
-                        elif j.comes_before(i):
-                            temp.add(Interval(
-                                j.upper_bound, i.upper_bound, 
-                                lower_closed=not j.upper_closed, 
-                                upper_closed=i.upper_closed))
-                        else:
-                            temp.add(Interval(
-                                i.lower_bound, j.lower_bound, 
-                                lower_closed=i.lower_closed, 
-                                upper_closed=not j.lower_closed))
-                    else:
-                        temp.add(copy.deepcopy(i))
-                result = temp
+            result = self._from_intervals(
+                _sweep_difference(self.intervals, other.intervals))
         else:
             raise TypeError(
                 "unsupported operand type(s) for -: expected BaseIntervalSet")
-        return self.__class__(result)
+        return result
 
     def difference(self, other):
         """Returns the difference between the object and the given object
@@ -1432,26 +1677,8 @@ class BaseIntervalSet(object):
         TypeError: unsupported operand type(s) for &: expected BaseIntervalSet
         """
         if isinstance(other, BaseIntervalSet):
-            result = IntervalSet()
-            for j in other.intervals:
-                for i in self.intervals:
-                    if i.overlaps(j):
-                        if i in j:
-                            result.add(copy.deepcopy(i))
-                        elif j in i:
-                            result.add(copy.deepcopy(j))
-                        elif j.comes_before(i):
-                            result.add(Interval(
-                                i.lower_bound, j.upper_bound, 
-                                lower_closed=i.lower_closed, 
-                                upper_closed=j.upper_closed))
-                        else:
-                            result.add(Interval(
-                                j.lower_bound, i.upper_bound, 
-                                lower_closed=j.lower_closed, 
-                                upper_closed=i.upper_closed))
-            # Convert IntervalSet to correct type
-            result = self.__class__(result)
+            result = self._from_intervals(
+                _sweep_intersection(self.intervals, other.intervals))
         else:
             raise TypeError(
                 "unsupported operand type(s) for &: expected BaseIntervalSet")
@@ -1516,13 +1743,12 @@ class BaseIntervalSet(object):
         TypeError: unsupported operand type(s) for |: expected BaseIntervalSet
         """
         if isinstance(other, BaseIntervalSet):
-            union = IntervalSet(self)
-            for r in other.intervals:
-                union.add(r)
+            union = self._from_intervals(
+                _sweep_union(self.intervals, other.intervals))
         else:
             raise TypeError(
                 "unsupported operand type(s) for |: expected BaseIntervalSet")
-        return self.__class__(union)
+        return union
 
     def union(self, other):
         """Returns the union of the given value with the object
@@ -1583,7 +1809,8 @@ class BaseIntervalSet(object):
         TypeError: unsupported operand type(s) for ^: expected BaseIntervalSet
         """
         if isinstance(other, BaseIntervalSet):
-            return (self | other) - (self & other)
+            return self._from_intervals(_sweep_symmetric_difference(
+                self.intervals, other.intervals))
         else:
             raise TypeError(
                 "unsupported operand type(s) for ^: expected BaseIntervalSet")
@@ -1926,20 +2153,32 @@ class BaseIntervalSet(object):
             r = Interval.equal_to(obj)
 
         if r:   # Don't bother appending an empty Interval
-            # If r continuously joins with any of the other
-            newIntervals = []
-            for i in self.intervals:
-                if i.overlaps(r) or i.adjacent_to(r):
-                    r = r.join(i)
-                else:
-                    newIntervals.append(i)
-            newIntervals.append(r)
-            self.intervals = newIntervals
-            try:
-                self.intervals.sort()
-            except Exception as e:
-                pass
+            # The Intervals r continuously joins with form a contiguous
+            # run of the sorted list: those ending no earlier than just
+            # before r starts, and starting no later than just after r ends
+            lower, upper = _lower_key(r), _upper_key(r)
+            start = _bisect_upper(self.intervals, (lower[0], lower[1] - 1))
+            stop = _bisect_lower(
+                self.intervals, (upper[0], upper[1] + 1), start)
+            if start < stop:
+                joined_lower = min(lower, _lower_key(self.intervals[start]))
+                joined_upper = max(upper, _upper_key(self.intervals[stop - 1]))
+                if (joined_lower, joined_upper) != (lower, upper):
+                    r = _from_keys(joined_lower, joined_upper)
+            self.intervals[start:stop] = [r]
     
+    @classmethod
+    def _from_intervals(cls, intervals):
+        """Wraps a normalized list of Intervals without re-adding them
+
+        The set operations build their results with a single sweep over
+        both operands, so the list is already sorted, disjoint and free
+        of adjacent Intervals.
+        """
+        result = cls()
+        result.intervals = intervals
+        return result
+
     def copy(self):
         """Returns a copy of the object
         
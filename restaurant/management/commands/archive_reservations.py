@@ -0,0 +1,26 @@
+import datetime
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from restaurant.archive import archive_reservations
+from restaurant.models import Reservation
+from restaurant.utils import day_bounds
+
+
+class Command(BaseCommand):
+    help = 'Moves past reservations to the reservation archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=0,
+            help='Keep the reservations of this many days before today.'
+        )
+
+    def handle(self, *args, **options):
+        day = timezone.localdate() - datetime.timedelta(days=options['days'])
+        cutoff, _ = day_bounds(day)
+        archived = archive_reservations(
+            Reservation.objects.filter(start_time__lt=cutoff)
+        )
+        self.stdout.write(f'Archived {archived} reservations.')
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from restaurant.cache import is_shared, stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows the hit rate of the table availability cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after showing them.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.AVAILABILITY_CACHE_STATS:
+            raise CommandError(
+                'Lookups are not counted, set '
+                'DJANGO_AVAILABILITY_CACHE_STATS=true.'
+            )
+        if not is_shared():
+            # This command's own process would have no lookups to show
+            raise CommandError(
+                'The counters are kept in the cache of each process, set '
+                'DJANGO_CACHE_LOCATION to share it.'
+            )
+        counters = stats()
+        lookups = counters['hits'] + counters['misses']
+        rate = counters['hits'] / lookups * 100 if lookups else 0
+        self.stdout.write(
+            f"hits: {counters['hits']}, misses: {counters['misses']}, "
+            f'hit rate: {rate:.1f}%'
+        )
+        if options['reset']:
+            reset_stats()
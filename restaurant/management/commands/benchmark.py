@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from restaurant.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    help = 'Runs a performance benchmark suite and prints its timings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES))
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=10000,
+            help='Size of the generated workload.'
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            default=[],
+            help='Server to load test, repeat to compare deployments.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=100,
+            help='Concurrent clients of the load test.'
+        )
+
+    def handle(self, *args, **options):
+        SUITES[options['suite']](self.stdout, options)
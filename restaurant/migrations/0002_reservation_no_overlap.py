@@ -0,0 +1,67 @@
+from django.db import migrations
+from django.db.models import F
+
+
+# Reservations of a table may not overlap. On Postgres this is a GiST
+# exclusion constraint over half-open time ranges, so reservations that
+# touch are allowed. SQLite has no exclusion constraints, triggers abort
+# the same inserts and updates there.
+FORWARD = {
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS btree_gist',
+        'ALTER TABLE restaurant_reservation '
+        'ADD CONSTRAINT reservation_no_overlap EXCLUDE USING gist '
+        '(table_id WITH =, tstzrange(start_time, end_time) WITH &&)',
+    ],
+    'sqlite': [
+        f'CREATE TRIGGER reservation_no_overlap_{event.lower()} '
+        f'BEFORE {event} ON restaurant_reservation '
+        'WHEN NEW.start_time < NEW.end_time AND EXISTS ('
+        'SELECT 1 FROM restaurant_reservation '
+        'WHERE table_id = NEW.table_id AND id IS NOT NEW.id '
+        'AND start_time < end_time '
+        'AND start_time < NEW.end_time AND NEW.start_time < end_time) '
+        "BEGIN SELECT RAISE(ABORT, 'reservation_no_overlap'); END"
+        for event in ('INSERT', 'UPDATE')
+    ],
+}
+
+BACKWARD = {
+    'postgresql': [
+        'ALTER TABLE restaurant_reservation '
+        'DROP CONSTRAINT reservation_no_overlap',
+    ],
+    'sqlite': [
+        'DROP TRIGGER reservation_no_overlap_insert',
+        'DROP TRIGGER reservation_no_overlap_update',
+    ],
+}
+
+
+def swap_reversed_ranges(apps, schema_editor):
+    # tstzrange() raises on a start after the end, so such rows would stop
+    # the constraint from being added. They were booked the wrong way round.
+    Reservation = apps.get_model('restaurant', 'Reservation')
+    Reservation.objects.filter(start_time__gt=F('end_time')).update(
+        start_time=F('end_time'), end_time=F('start_time')
+    )
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(swap_reversed_ranges, migrations.RunPython.noop),
+        migrations.RunPython(run(FORWARD), run(BACKWARD)),
+    ]
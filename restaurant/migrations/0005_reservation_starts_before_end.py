@@ -0,0 +1,74 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+# Adding or removing a constraint rebuilds the table on SQLite, without the
+# no-overlap triggers of 0002
+SQLITE_TRIGGERS = [
+    f'DROP TRIGGER IF EXISTS reservation_no_overlap_{event.lower()}'
+    for event in ('INSERT', 'UPDATE')
+] + [
+    f'CREATE TRIGGER reservation_no_overlap_{event.lower()} '
+    f'BEFORE {event} ON restaurant_reservation '
+    'WHEN NEW.start_time < NEW.end_time AND EXISTS ('
+    'SELECT 1 FROM restaurant_reservation '
+    'WHERE table_id = NEW.table_id AND id IS NOT NEW.id '
+    'AND start_time < end_time '
+    'AND start_time < NEW.end_time AND NEW.start_time < end_time) '
+    "BEGIN SELECT RAISE(ABORT, 'reservation_no_overlap'); END"
+    for event in ('INSERT', 'UPDATE')
+]
+
+
+def create_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+def fix_ranges(apps, schema_editor):
+    # Rows booked the wrong way round are swapped, like 0002 does before
+    # the no-overlap constraint (SQLite let new ones in since). Rows that
+    # end when they start hold no time, they're archived.
+    Reservation = apps.get_model('restaurant', 'Reservation')
+    ArchivedReservation = apps.get_model('restaurant', 'ArchivedReservation')
+    Reservation.objects.filter(
+        start_time__gt=django.db.models.expressions.F('end_time')
+    ).update(
+        start_time=django.db.models.expressions.F('end_time'),
+        end_time=django.db.models.expressions.F('start_time')
+    )
+    empty = Reservation.objects.filter(
+        start_time=django.db.models.expressions.F('end_time')
+    )
+    ArchivedReservation.objects.bulk_create(
+        ArchivedReservation(
+            table_number=table_number,
+            start_time=start_time,
+            end_time=end_time
+        )
+        for table_number, start_time, end_time in empty.values_list(
+            'table__number', 'start_time', 'end_time'
+        )
+    )
+    empty.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0004_archivedreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_ranges, create_sqlite_triggers),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.CheckConstraint(check=models.Q(('start_time__lt', django.db.models.expressions.F('end_time'))), name='reservation_starts_before_end'),
+        ),
+        migrations.RunPython(
+            create_sqlite_triggers, migrations.RunPython.noop
+        ),
+    ]
@@ -26,5 +26,40 @@ class Reservation(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['table', 'start_time'],
+                name='reservation_table_start_idx'
+            ),
+            models.Index(fields=['start_time'], name='reservation_start_idx'),
+        ]
+        constraints = [
+            # Also keeps the ranges of the no-overlap constraint valid
+            models.CheckConstraint(
+                check=models.Q(start_time__lt=models.F('end_time')),
+                name='reservation_starts_before_end'
+            ),
+        ]
+
     def __str__(self):
         return f'reserver from {self.start_time} to {self.end_time}'
+
+
+class ArchivedReservation(models.Model):
+    # Past reservations moved out of Reservation, kept with the number of
+    # their table so they outlive it.
+    table_number = models.IntegerField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['start_time'], name='archived_start_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'reserved from {self.start_time} to {self.end_time}'
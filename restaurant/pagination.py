@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReservationCursorPagination(CursorPagination):
+    # Keyset pages: the cursor holds the last start time seen, so fetching
+    # a page costs the same however deep it is, and there's no COUNT(*).
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get('time_order') == 'dsc':
+            return ('-start_time', '-id')
+        return ('start_time', 'id')
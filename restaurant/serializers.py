@@ -1,11 +1,16 @@
 from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 from restaurant.models import Table, Reservation
-from restaurant.utils import normalize_table, check_time_between
-import datetime
+from restaurant.utils import is_bookable
 from drf_custom_related_field import CustomRelatedField
 
 
+INVALID_TIME_MESSAGE = \
+    'Invalid start or end time, please check available slots.'
+
+
 class TableSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -46,26 +51,29 @@ class ReservationSerializer(serializers.Serializer):
             table = validated_data.get('table')
             start_time = validated_data.pop('start_time')
             end_time = validated_data.pop('end_time')
-            s_time = start_time.strftime('%H:%M %p')
-            e_time = end_time.strftime('%H:%M %p')
-            times = normalize_table(table)
-            is_valid = check_time_between((s_time, e_time), times)
-            if not is_valid:
-                raise ValidationError(
-                    'Invalid start or end time, please check available slots.'
-                )
-            today = datetime.datetime.now()
+            if not is_bookable(table, start_time, end_time):
+                raise ValidationError(INVALID_TIME_MESSAGE)
+            # Aware, so that it falls in the same day as day_bounds()
+            today = timezone.localtime()
             validated_data['start_time'] = today.replace(
                 hour=start_time.hour,
                 minute=start_time.minute,
-                second=start_time.second
+                second=start_time.second,
+                microsecond=0
             )
             validated_data['end_time'] = today.replace(
                 hour=end_time.hour,
                 minute=end_time.minute,
-                second=end_time.second
+                second=end_time.second,
+                microsecond=0
             )
-            instance = Reservation.objects.create(**validated_data)
+            try:
+                with transaction.atomic():
+                    instance = Reservation.objects.create(**validated_data)
+            except (IntegrityError, DataError):
+                # The database refuses overlapping reservations booked
+                # concurrently, after both passed the check above.
+                raise ValidationError(INVALID_TIME_MESSAGE)
             instance.start_time = start_time
             instance.end_time = end_time
             return instance
@@ -75,3 +83,31 @@ class ReservationSerializer(serializers.Serializer):
 
 class CheckAvailableSlotsSerializer(serializers.Serializer):
     num_of_seats = serializers.IntegerField(required=True)
+    start_time = serializers.TimeField(
+                format='%I:%M %p',
+                input_formats=['%I:%M %p'],
+                required=False
+            )
+    end_time = serializers.TimeField(
+                format='%I:%M %p',
+                input_formats=['%I:%M %p'],
+                required=False
+            )
+
+    def validate(self, data):
+        # A block of time needs both ends
+        if ('start_time' in data) != ('end_time' in data):
+            raise serializers.ValidationError(
+                'start_time and end_time must be sent together.'
+            )
+        return data
+
+
+class AllocateTableSerializer(serializers.Serializer):
+    num_of_seats = serializers.IntegerField(required=True, min_value=1)
+    start_time = serializers.TimeField(
+                format='%I:%M %p',
+                input_formats=['%I:%M %p']
+            )
+    # In minutes
+    duration = serializers.IntegerField(required=True, min_value=1)
@@ -0,0 +1,69 @@
+import contextlib
+import contextvars
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from restaurant.models import Table, Reservation
+from restaurant.broadcast import publish_table, publish_table_pk
+from restaurant.cache import invalidate, invalidate_tables
+
+
+# Set while callers report the changes themselves, e.g. once per table-day
+# for a whole batch of reservations
+muted = contextvars.ContextVar('restaurant_signals_muted', default=False)
+
+
+@contextlib.contextmanager
+def mute_reservation_signals():
+    token = muted.set(True)
+    try:
+        yield
+    finally:
+        muted.reset(token)
+
+
+def reservation_day(reservation):
+    if timezone.is_aware(reservation.start_time):
+        return timezone.localtime(reservation.start_time).date()
+    return reservation.start_time.date()
+
+
+@receiver(pre_save, sender=Reservation)
+def invalidate_previous_day(sender, instance, **kwargs):
+    # Only edits from the admin panel move an existing reservation
+    if instance.pk:
+        previous = Reservation.objects.filter(pk=instance.pk).first()
+        if previous:
+            invalidate(previous.table_id, reservation_day(previous))
+
+
+def reservations_changed(table_id, day):
+    invalidate(table_id, day)
+    # Streams only show today's availability
+    if day == timezone.localdate():
+        transaction.on_commit(lambda: publish_table_pk(table_id))
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def reservation_changed(sender, instance, **kwargs):
+    if muted.get():
+        return
+    reservations_changed(instance.table_id, reservation_day(instance))
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def invalidate_table_set(sender, instance, **kwargs):
+    invalidate_tables()
+
+
+@receiver(post_save, sender=Table)
+def push_table(sender, instance, **kwargs):
+    transaction.on_commit(lambda: publish_table(instance))
+
+
+@receiver(post_delete, sender=Table)
+def push_deleted_table(sender, instance, **kwargs):
+    transaction.on_commit(lambda: publish_table(instance, deleted=True))
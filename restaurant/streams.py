@@ -0,0 +1,163 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from restaurant.async_views import database_sync_to_async
+from restaurant.broadcast import get_broadcast
+from restaurant.models import Table
+from restaurant.utils import check_available_slots
+from users.authentication import CachedJWTAuthentication
+
+
+AVAILABLE_SLOTS_STREAM_PATH = '/api/tables/check-available-slots/stream/'
+# Keeps proxies from closing idle streams
+HEARTBEAT_INTERVAL = 15
+
+
+def authenticate(scope, query):
+    # EventSource can't set headers, so the token may come in the query
+    header = dict(scope['headers']).get(b'authorization', b'').split()
+    if len(header) == 2 and header[0] == b'Bearer':
+        raw_token = header[1]
+    else:
+        raw_token = query.get('token', [''])[0]
+    authentication = CachedJWTAuthentication()
+    try:
+        user = authentication.get_user(
+            authentication.get_validated_token(raw_token)
+        )
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    # The same users as check-available-slots
+    return user if user.role == 'Admin' else None
+
+
+def parse_subscription(query):
+    num_of_seats = query.get('num_of_seats', [''])[0]
+    tables = query.get('tables', [''])[0]
+    if num_of_seats.isdigit() and int(num_of_seats) > 0:
+        return {'num_of_seats': int(num_of_seats)}
+    if tables and all(number.isdigit() for number in tables.split(',')):
+        return {'tables': {int(number) for number in tables.split(',')}}
+    return None
+
+
+def matches(subscription, message):
+    if 'tables' in subscription:
+        return message['number'] in subscription['tables']
+    return message['num_of_seats'] >= subscription['num_of_seats']
+
+
+def snapshot(subscription):
+    if 'tables' in subscription:
+        return check_available_slots(
+            Table.objects.filter(number__in=subscription['tables']), 1
+        )
+    return check_available_slots(
+        Table.objects.all(), subscription['num_of_seats']
+    )
+
+
+def event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+async def respond(send, status, data):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps(data).encode(),
+    })
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def available_slots_stream(scope, receive, send):
+    """
+    Server-Sent Events for check-available-slots: the available slots for
+    'num_of_seats' (or the table numbers in 'tables') once, then the slots
+    of each table whose availability changes.
+    """
+    query = parse_qs(scope['query_string'].decode())
+    user = await database_sync_to_async(authenticate)(scope, query)
+    if user is None:
+        await respond(send, 401, {'detail': 'Admin access token required.'})
+        return
+    subscription = parse_subscription(query)
+    if subscription is None:
+        await respond(send, 400, {
+            'message': "Pass 'num_of_seats' or comma separated 'tables'."
+        })
+        return
+    broadcast = get_broadcast()
+    # Before the snapshot, so that no change falls in between
+    queue = broadcast.subscribe()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    message = None
+    try:
+        slots = await database_sync_to_async(snapshot)(subscription)
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': event('snapshot', {'ordered_available_slots': slots}),
+            'more_body': True,
+        })
+        shown = {
+            int(key.split('#')[1]) for table in slots for key in table
+        }
+        while True:
+            message = message or asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {message, disconnect},
+                timeout=HEARTBEAT_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnect in done:
+                break
+            if message not in done:
+                body = b': heartbeat\n\n'
+            else:
+                change = message.result()
+                message = None
+                if change is None:
+                    # Fell behind and was dropped, the client reconnects
+                    # for a new snapshot
+                    await send({'type': 'http.response.body'})
+                    break
+                number = change['number']
+                if matches(subscription, change):
+                    shown.add(number)
+                    slots = change['slots']
+                elif number in shown:
+                    # A table whose seats no longer fit the subscription
+                    shown.discard(number)
+                    slots = []
+                else:
+                    continue
+                body = event('change', {f'table #{number}': slots})
+            await send({
+                'type': 'http.response.body',
+                'body': body,
+                'more_body': True,
+            })
+    finally:
+        broadcast.unsubscribe(queue)
+        disconnect.cancel()
+        if message is not None:
+            message.cancel()
@@ -1,19 +1,61 @@
-from django.test import TestCase
-from restaurant.models import Table, Reservation
+from django.test import (
+    TestCase, SimpleTestCase, TransactionTestCase, override_settings
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, connections, transaction
+from restaurant.models import Table, Reservation, ArchivedReservation
 from restaurant.serializers import (
-    TableSerializer, ReservationDetailSerializer
+    TableSerializer, ReservationDetailSerializer, ReservationSerializer
 )
+from restaurant.utils import check_available_slots, day_bounds
+from restaurant.availability import AvailabilityIndex, format_time
+from restaurant.cache import get_reservation_times, stats
+from restaurant.archive import archive_reservations
+from restaurant.local_requirements.interval import Interval, IntervalSet
+from django.core.management import CommandError, call_command
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+from restaurant.renderers import FastJSONRenderer
+from restaurant import async_views
+from restaurant.async_views import ASYNC_ROUTES, thread_pool_routes
+from restaurant.urls import router
+from restaurant.broadcast import LocalBroadcast, get_broadcast
+from restaurant.streams import available_slots_stream
+from core.asgi import application
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import status
+from unittest import mock, skipUnless
+import asyncio
+import contextlib
 import datetime
+import decimal
+import functools
+import gc
+import itertools
+import io
+import copy
+import csv
+import json
+import tempfile
+import threading
+import time
 
 
 TABLE_URL = reverse('restaurant:table-list')
 AVAILABLE_SLOTS_URL = reverse('restaurant:table-check-available-slots')
+TABLE_COMBINATIONS_URL = reverse('restaurant:table-check-table-combinations')
 RESERVATIONS_URL = reverse('restaurant:reservation-list')
 TODAY_RESERVATIONS_URL = reverse('restaurant:reservation-today-reservations')
+EXPORT_RESERVATIONS_URL = reverse('restaurant:reservation-export')
+ALLOCATE_URL = reverse('restaurant:reservation-allocate')
 
 
 def table_detail_url(table_number):
@@ -32,6 +74,40 @@ def sample_table(number=33, num_of_seats=7):
     return Table.objects.create(**default)
 
 
+def close_thread_connections():
+    # The test database can't be dropped while other threads still hold
+    # connections: the one sync_to_async() runs thread-sensitive calls in,
+    # every thread of the async views, and the pool threads of
+    # asyncio.run(), which are gone but whose connections only close once
+    # collected.
+    asyncio.run(sync_to_async(connections.close_all)())
+    # Each thread closes its own, the barrier keeps one from running two
+    barrier = threading.Barrier(settings.ASYNC_VIEW_THREADS)
+
+    def close_all():
+        barrier.wait()
+        connections.close_all()
+
+    for future in [
+        async_views.executor.submit(close_all)
+        for _ in range(settings.ASYNC_VIEW_THREADS)
+    ]:
+        future.result()
+    gc.collect()
+
+
+@contextlib.contextmanager
+def shared_cache():
+    # Unlike the local memory cache, processes on a host share the files
+    with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }
+    }):
+        yield
+
+
 def sample_reservation(
             table_obj,
             start_time=datetime.datetime.now(),
@@ -45,6 +121,291 @@ def sample_reservation(
     return Reservation.objects.create(**default)
 
 
+class IntervalSetTests(SimpleTestCase):
+
+    def test_numeric_interval_is_slotted(self):
+        interval = Interval(5400.0, 3600.0, lower_closed=False)
+        self.assertFalse(hasattr(interval, '__dict__'))
+        self.assertEqual(
+            interval,
+            Interval(3600.0, 5400.0, upper_closed=False)
+        )
+        self.assertIs(copy.deepcopy(interval), interval)
+
+    def test_difference_keeps_bounds(self):
+        day = IntervalSet([Interval(0, 10)])
+        booked = IntervalSet([Interval(2, 4), Interval(6, 8)])
+        self.assertEqual(
+            (day - booked).intervals,
+            [
+                Interval(0, 2, upper_closed=False),
+                Interval(4, 6, closed=False),
+                Interval(8, 10, lower_closed=False),
+            ]
+        )
+
+    def test_difference_drops_empty_intervals(self):
+        day = IntervalSet([Interval(0, 10)])
+        booked = IntervalSet([Interval(0, 4), Interval(8, 10)])
+        self.assertEqual(
+            (day - booked).intervals,
+            [Interval(4, 8, closed=False)]
+        )
+
+    def test_union_joins_adjacent_intervals(self):
+        left = IntervalSet([Interval(0, 2, upper_closed=False)])
+        right = IntervalSet([Interval(2, 4), Interval(6, 8)])
+        self.assertEqual(
+            (left | right).intervals,
+            [Interval(0, 4), Interval(6, 8)]
+        )
+
+    def test_build_from_unsorted_intervals(self):
+        booked = IntervalSet(
+            [Interval(6, 8), Interval(0, 2), Interval(1, 3), 10]
+        )
+        self.assertEqual(
+            booked.intervals,
+            [Interval(0, 3), Interval(6, 8), Interval(10, 10)]
+        )
+
+    def test_add_joins_neighbours(self):
+        booked = IntervalSet([Interval(0, 2), Interval(4, 6), Interval(9, 10)])
+        booked.add(Interval(2, 4, closed=False))
+        self.assertEqual(booked.intervals, [Interval(0, 6), Interval(9, 10)])
+        booked.add(Interval(7, 8))
+        self.assertEqual(
+            booked.intervals,
+            [Interval(0, 6), Interval(7, 8), Interval(9, 10)]
+        )
+
+    def test_contains(self):
+        some = IntervalSet([
+            Interval(0, 4, upper_closed=False),
+            Interval(6, 9, lower_closed=False),
+        ])
+        self.assertIn(Interval(1, 3), some)
+        self.assertIn(Interval(6, 9, lower_closed=False), some)
+        self.assertNotIn(Interval(6, 9), some)
+        self.assertNotIn(Interval(3, 7), some)
+        self.assertIn(8, some)
+        self.assertNotIn(4, some)
+
+    def test_intersection_and_symmetric_difference(self):
+        first = IntervalSet([Interval(0, 4)])
+        second = IntervalSet([Interval(2, 6)])
+        self.assertEqual((first & second).intervals, [Interval(2, 4)])
+        self.assertEqual(
+            (first ^ second).intervals,
+            [
+                Interval(0, 2, upper_closed=False),
+                Interval(4, 6, lower_closed=False),
+            ]
+        )
+
+
+class AvailabilityIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        tables = [Table(pk=1, num_of_seats=2), Table(pk=2, num_of_seats=6)]
+        self.index = AvailabilityIndex(
+            13 * 3600, 23 * 3600 + 59 * 60, tables
+        )
+
+    def test_format_time(self):
+        for minutes in [0, 13 * 60, 12 * 60 + 5, 23 * 60 + 59]:
+            seconds = minutes * 60
+            expected = (
+                datetime.datetime(1900, 1, 1) +
+                datetime.timedelta(seconds=seconds)
+            ).strftime('%I:%M %p')
+            self.assertEqual(format_time(seconds), expected)
+
+    def test_book_and_cancel(self):
+        self.index.book(1, 14 * 3600, 15 * 3600)
+        self.assertEqual(
+            self.index.slots(1),
+            ['01:00 PM - 02:00 PM', '03:00 PM - 11:59 PM']
+        )
+        self.assertEqual(self.index.slots(2), ['01:00 PM - 11:59 PM'])
+        self.index.cancel(1, 14 * 3600, 15 * 3600)
+        self.assertEqual(self.index.slots(1), ['01:00 PM - 11:59 PM'])
+
+    def test_free_tables(self):
+        self.index.book(2, 18 * 3600, 20 * 3600)
+        free_tables = self.index.free_tables
+        self.assertEqual(free_tables(1, 15 * 3600, 18 * 3600), [1, 2])
+        self.assertEqual(free_tables(1, 17 * 3600, 19 * 3600), [1])
+        self.assertEqual(free_tables(4, 17 * 3600, 19 * 3600), [])
+        self.assertEqual(free_tables(1, 12 * 3600, 14 * 3600), [])
+
+    def test_combinations_match_exhaustive_search(self):
+        tables = [
+            Table(pk=pk, num_of_seats=seats)
+            for pk, seats in enumerate([12, 9, 8, 8, 6, 5, 4, 3, 2, 2], 1)
+        ]
+        index = AvailabilityIndex(13 * 3600, 23 * 3600 + 59 * 60, tables)
+        for pk in range(1, 11):
+            start = (13 + pk) * 3600
+            index.book(pk, start, start + 2 * 3600)
+        seats = dict(index.tables)
+        for num_of_seats, bounds in [
+                (15, ()), (25, ()), (25, (13 * 3600, 14 * 3600)), (40, ())]:
+            mask = index.mask(*bounds) if bounds else 0
+            expected = sorted(
+                (sum(seats[pk] for pk in pks) - num_of_seats, len(pks))
+                for size in range(1, 5)
+                for pks in itertools.combinations(seats, size)
+                # Without a table to spare
+                if sum(seats[pk] for pk in pks) >= num_of_seats >
+                sum(seats[pk] for pk in pks) - min(seats[pk] for pk in pks)
+                and index.common_runs(pks)
+                and functools.reduce(
+                    int.__and__, (index.bitmaps[pk] for pk in pks)
+                ) & mask == mask
+            )[:10]
+            self.assertEqual([
+                (wasted, len(pks))
+                for wasted, pks in index.combinations(num_of_seats, *bounds)
+            ], expected)
+
+    def test_combinations_of_identical_tables(self):
+        tables = [
+            Table(pk=pk, num_of_seats=2 if pk <= 40 else 4)
+            for pk in range(1, 61)
+        ]
+        index = AvailabilityIndex(13 * 3600, 23 * 3600 + 59 * 60, tables)
+        index.book(60, 13 * 3600, 14 * 3600)
+        combinations = index.combinations(11)
+        self.assertEqual(
+            [(wasted, len(pks)) for wasted, pks in combinations],
+            [(1, 3)] * 10
+        )
+        self.assertEqual(
+            len({frozenset(pks) for _, pks in combinations}), 10
+        )
+        # Out of steps, the best found by then
+        with self.assertLogs('restaurant.availability', 'WARNING') as logs:
+            self.assertEqual(
+                [(wasted, len(pks)) for wasted, pks in index.combinations(
+                    11, max_steps=2
+                )],
+                [(1, 3)] * 10
+            )
+            self.assertEqual(index.combinations(11, max_steps=0), [])
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('after 2 steps', logs.records[0].getMessage())
+
+    def test_best_tables(self):
+        tables = [
+            Table(pk=1, num_of_seats=6),
+            Table(pk=2, num_of_seats=4),
+            Table(pk=3, num_of_seats=4),
+            Table(pk=4, num_of_seats=4),
+        ]
+        index = AvailabilityIndex(13 * 3600, 23 * 3600 + 59 * 60, tables)
+        # Would leave 30 minutes nobody can book before 6 PM
+        index.book(3, 13 * 3600, 17 * 3600 + 30 * 60)
+        # Free from 4 PM only, a tighter fit than table 4
+        index.book(2, 13 * 3600, 16 * 3600)
+        self.assertEqual(
+            list(index.best_tables(4, 18 * 3600, 20 * 3600)), [2, 4, 3, 1]
+        )
+        self.assertEqual(list(index.best_tables(4, 15 * 3600, 17 * 3600)), [
+            4, 1
+        ])
+        self.assertEqual(list(index.best_tables(8, 15 * 3600, 17 * 3600)), [])
+
+
+class ThreadPoolRoutesTests(SimpleTestCase):
+
+    def test_only_hot_routes_are_awaited(self):
+        routes = thread_pool_routes(router.urls)
+        self.assertEqual(
+            [route.pattern.regex.pattern for route in routes],
+            [route.pattern.regex.pattern for route in router.urls]
+        )
+        for route, original in zip(routes, router.urls):
+            self.assertEqual(route.name, original.name)
+            self.assertEqual(
+                asyncio.iscoroutinefunction(route.callback),
+                route.name in ASYNC_ROUTES
+            )
+            # Keeps what DRF and swagger read from the view
+            self.assertIs(route.callback.cls, original.callback.cls)
+            self.assertTrue(route.callback.csrf_exempt)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_same_bytes_as_json_renderer(self):
+        data = {
+            'results': [
+                {'pk': 1, 'table_number': 12, 'start_time': '01:00 PM'},
+                {'pk': 2, 'table_number': None, 'start_time': ''},
+            ],
+            'next': 'http://testserver/api/reservations/?cursor=cD0y',
+            'text': 'caf\xe9 \u2028 \u2029 "quoted"',
+            'when': timezone.make_aware(
+                datetime.datetime(2021, 9, 10, 15, 30, 0, 123456)
+            ),
+            'day': datetime.date(2021, 9, 10),
+            'price': decimal.Decimal('10.50'),
+            'flags': (True, False),
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+
+
+class ReservationQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tables = [sample_table(number, 4) for number in range(1, 21)]
+        start = timezone.make_aware(datetime.datetime(2021, 1, 1, 14))
+        Reservation.objects.bulk_create(
+            Reservation(
+                table=table,
+                start_time=start + datetime.timedelta(days=day),
+                end_time=start + datetime.timedelta(days=day, hours=2)
+            )
+            for table in tables for day in range(100)
+        )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE restaurant_reservation')
+
+    def assertIndexScan(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            self.assertIn('Index', plan)
+            self.assertNotIn('Seq Scan on restaurant_reservation', plan)
+        else:
+            self.assertIn('USING INDEX', plan)
+            self.assertNotIn('SCAN restaurant_reservation', plan)
+
+    def test_day_filters_use_indexes(self):
+        start, end = day_bounds(datetime.date(2021, 2, 1))
+        tables = list(Table.objects.values_list('pk', flat=True)[:5])
+        self.assertIndexScan(Reservation.objects.filter(
+            table_id__in=tables, start_time__gte=start, start_time__lt=end
+        ))
+        self.assertIndexScan(Reservation.objects.filter(
+            start_time__gte=start, start_time__lt=end
+        ))
+        start, end = day_bounds(
+            datetime.date(2021, 2, 1), datetime.date(2021, 2, 3)
+        )
+        self.assertIndexScan(Reservation.objects.filter(
+            start_time__gte=start, start_time__lt=end
+        ))
+
+
 class PublicRestaurantAPITests(TestCase):
 
     def setUp(self):
@@ -53,8 +414,10 @@ class PublicRestaurantAPITests(TestCase):
     def test_login_required(self):
         res_1 = self.client.get(TABLE_URL)
         res_2 = self.client.get(RESERVATIONS_URL)
+        res_3 = self.client.get(EXPORT_RESERVATIONS_URL)
         self.assertEqual(res_1.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(res_2.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res_3.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
 class RestaurantAPITests(TestCase):
@@ -68,6 +431,7 @@ class RestaurantAPITests(TestCase):
         )
         self.client = APIClient()
         self.client.force_authenticate(self.admin_user)
+        cache.clear()
 
     def test_list_tables(self):
         sample_table()
@@ -102,6 +466,95 @@ class RestaurantAPITests(TestCase):
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_delete_table_with_reservations(self):
+        table = sample_table()
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        for hours in range(3):
+            start_time = yesterday + datetime.timedelta(hours=hours)
+            sample_reservation(
+                table_obj=table,
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(minutes=30)
+            )
+        url = table_detail_url(table.number)
+        res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        upcoming = sample_reservation(
+            table_obj=table,
+            start_time=timezone.now() + datetime.timedelta(hours=1),
+            end_time=timezone.now() + datetime.timedelta(hours=2)
+        )
+        res = self.client.delete(url + '?allow_past=true')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        upcoming.delete()
+        res = self.client.delete(url + '?allow_past=true')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(Table.objects.exists())
+        self.assertEqual(
+            list(ArchivedReservation.objects.values_list(
+                'table_number', flat=True
+            )),
+            [table.number] * 3
+        )
+
+    @skipUnless(
+        connection.features.has_select_for_update,
+        'Reservations are only kept out by a row lock'
+    )
+    def test_delete_table_locks_it(self):
+        table = sample_table()
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.delete(table_detail_url(table.number))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        locks = [
+            query['sql'] for query in queries
+            if query['sql'].endswith('FOR UPDATE')
+        ]
+        self.assertEqual(len(locks), 1)
+        self.assertIn('"restaurant_table"', locks[0])
+
+    def test_archive_reservations(self):
+        table = sample_table()
+        today = timezone.localdate()
+        for days in range(4):
+            start_time = timezone.make_aware(datetime.datetime.combine(
+                today - datetime.timedelta(days=days), datetime.time(14)
+            ))
+            sample_reservation(
+                table_obj=table,
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1)
+            )
+        call_command('archive_reservations', days=1, stdout=io.StringIO())
+        self.assertEqual(Reservation.objects.count(), 2)
+        self.assertEqual(ArchivedReservation.objects.count(), 2)
+        call_command('archive_reservations', stdout=io.StringIO())
+        self.assertEqual(
+            Reservation.objects.get().start_time.date(), today
+        )
+        self.assertEqual(ArchivedReservation.objects.count(), 3)
+
+    def test_archive_reservations_invalidates_once_per_day(self):
+        table = sample_table()
+        day = timezone.localdate() - datetime.timedelta(days=2)
+        start_time = timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time(10))
+        )
+        for minutes in range(0, 300, 30):
+            sample_reservation(
+                table_obj=table,
+                start_time=start_time + datetime.timedelta(minutes=minutes),
+                end_time=start_time + datetime.timedelta(minutes=minutes + 30)
+            )
+        invalidated = []
+        with mock.patch(
+            'restaurant.signals.invalidate',
+            side_effect=lambda *args: invalidated.append(args)
+        ), self.assertNumQueries(9):
+            archived = archive_reservations(Reservation.objects.all())
+        self.assertEqual(archived, 10)
+        self.assertEqual(invalidated, [(table.pk, day)])
+
     def test_available_slots(self):
         table = sample_table()
         payload = {
@@ -120,6 +573,166 @@ class RestaurantAPITests(TestCase):
         }
         self.assertEqual(res.data, exp)
 
+    def test_available_slots_query_count(self):
+        for number in range(1, 6):
+            table = sample_table(number, 4)
+            sample_reservation(table_obj=table)
+        with self.assertNumQueries(2):
+            slots = check_available_slots(Table.objects.all(), 2)
+        self.assertEqual(len(slots), 5)
+
+    @override_settings(AVAILABILITY_CACHE_STATS=True)
+    def test_available_slots_cached(self):
+        for number in range(1, 6):
+            sample_reservation(table_obj=sample_table(number, 4))
+        expected = check_available_slots(Table.objects.all(), 2)
+        with self.assertNumQueries(1):
+            slots = check_available_slots(Table.objects.all(), 2)
+        self.assertEqual(slots, expected)
+        self.assertEqual(stats(), {'hits': 5, 'misses': 5})
+
+    @override_settings(AVAILABILITY_CACHE_STATS=True)
+    def test_cache_holds_every_table(self):
+        loaded = []
+
+        def load(pks, day):
+            loaded.extend(pks)
+            return {pk: [] for pk in pks}
+        pks = list(range(1, 1001))
+        for _ in range(3):
+            get_reservation_times(pks, datetime.date.today(), load)
+        self.assertEqual(loaded, pks)
+        self.assertEqual(stats(), {'hits': 2000, 'misses': 1000})
+
+    @override_settings(AVAILABILITY_CACHE_STATS=True)
+    def test_cache_stats_need_a_shared_cache(self):
+        with self.assertRaises(CommandError):
+            call_command('availability_cache_stats', stdout=io.StringIO())
+
+    def test_cache_stats_are_off_by_default(self):
+        def load(pks, day):
+            return {pk: [] for pk in pks}
+        with mock.patch('restaurant.cache.count') as count:
+            get_reservation_times([1, 2], datetime.date.today(), load)
+        count.assert_not_called()
+        self.assertEqual(stats(), {'hits': 0, 'misses': 0})
+        with self.assertRaises(CommandError):
+            call_command('availability_cache_stats', stdout=io.StringIO())
+
+    @override_settings(AVAILABILITY_CACHE_STATS=True)
+    def test_available_slots_cache_invalidation(self):
+        table = sample_table(1, 4)
+        sample_table(2, 4)
+        free = check_available_slots(Table.objects.all(), 2)
+        reservation = sample_reservation(table_obj=table)
+        booked = check_available_slots(Table.objects.all(), 2)
+        self.assertNotEqual(booked[0], free[0])
+        self.assertEqual(booked[1], free[1])
+        self.assertEqual(stats(), {'hits': 1, 'misses': 3})
+        reservation.delete()
+        self.assertEqual(check_available_slots(Table.objects.all(), 2), free)
+
+    def test_available_slots_from_opening_time(self):
+        table = sample_table()
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(today, datetime.time(13)),
+            end_time=datetime.datetime.combine(today, datetime.time(15))
+        )
+        res = self.client.post(AVAILABLE_SLOTS_URL, {'num_of_seats': 5})
+        exp = [{f'table #{table.number}': ['03:00 PM - 11:59 PM']}]
+        self.assertEqual(res.data['ordered_available_slots'], exp)
+
+    def test_available_slots_keep_minutes(self):
+        table = sample_table()
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(
+                today, datetime.time(14, 15, 40)
+            ),
+            end_time=datetime.datetime.combine(today, datetime.time(16, 45))
+        )
+        res = self.client.post(AVAILABLE_SLOTS_URL, {'num_of_seats': 5})
+        exp = [{
+            f'table #{table.number}': [
+                '01:00 PM - 02:15 PM', '04:45 PM - 11:59 PM'
+            ]
+        }]
+        self.assertEqual(res.data['ordered_available_slots'], exp)
+
+    def test_available_slots_for_block(self):
+        table = sample_table()
+        busy_table = sample_table(34)
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=busy_table,
+            start_time=datetime.datetime.combine(today, datetime.time(17)),
+            end_time=datetime.datetime.combine(today, datetime.time(19))
+        )
+        payload = {
+            'num_of_seats': 5,
+            'start_time': '06:00 PM',
+            'end_time': '08:00 PM'
+        }
+        res = self.client.post(AVAILABLE_SLOTS_URL, payload)
+        exp = [{f'table #{table.number}': ['01:00 PM - 11:59 PM']}]
+        self.assertEqual(res.data['ordered_available_slots'], exp)
+
+    def test_available_slots_need_both_ends(self):
+        sample_table()
+        for url in (AVAILABLE_SLOTS_URL, TABLE_COMBINATIONS_URL):
+            for payload in (
+                {'num_of_seats': 5, 'start_time': '06:00 PM'},
+                {'num_of_seats': 5, 'end_time': '08:00 PM'},
+            ):
+                res = self.client.post(url, payload)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_table_combinations_for_large_party(self):
+        sample_table(1, 12)
+        sample_table(2, 10)
+        sample_table(3, 6)
+        busy_table = sample_table(4, 8)
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=busy_table,
+            start_time=datetime.datetime.combine(today, datetime.time(13)),
+            end_time=datetime.datetime.combine(today, datetime.time(19))
+        )
+        res = self.client.post(AVAILABLE_SLOTS_URL, {'num_of_seats': 20})
+        self.assertEqual(res.data['ordered_available_slots'], [])
+        res = self.client.post(TABLE_COMBINATIONS_URL, {'num_of_seats': 20})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['table_combinations'][:3], [
+            {
+                'tables': [1, 4],
+                'wasted_seats': 0,
+                'slots': ['07:00 PM - 11:59 PM']
+            },
+            {
+                'tables': [1, 2],
+                'wasted_seats': 2,
+                'slots': ['01:00 PM - 11:59 PM']
+            },
+            {
+                'tables': [2, 4, 3],
+                'wasted_seats': 4,
+                'slots': ['07:00 PM - 11:59 PM']
+            },
+        ])
+        payload = {
+            'num_of_seats': 20,
+            'start_time': '05:00 PM',
+            'end_time': '07:00 PM'
+        }
+        res = self.client.post(TABLE_COMBINATIONS_URL, payload)
+        self.assertEqual(
+            [c['tables'] for c in res.data['table_combinations']],
+            [[1, 2]]
+        )
+
     def test_list_reservations(self):
         table = sample_table()
         sample_reservation(table_obj=table)
@@ -138,6 +751,192 @@ class RestaurantAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_reservation_read_query_counts(self):
+        reservations = [
+            sample_reservation(table_obj=sample_table(number, 4))
+            for number in range(1, 26)
+        ]
+        # A count and a page, whatever the page size
+        with self.assertNumQueries(2):
+            res = self.client.get(RESERVATIONS_URL)
+        self.assertEqual(len(res.data['results']), 20)
+        with self.assertNumQueries(2):
+            self.client.get(RESERVATIONS_URL + '?table_number=3')
+        with self.assertNumQueries(1):
+            res = self.client.get(TODAY_RESERVATIONS_URL)
+        self.assertEqual(len(res.data), 25)
+        with self.assertNumQueries(1):
+            self.client.get(reservation_detail_url(reservations[0].id))
+
+    def test_reservation_cursor_pagination(self):
+        today = datetime.date.today()
+        for number in range(1, 31):
+            # Ten reservations share each start time
+            start_time = datetime.datetime.combine(
+                today, datetime.time(13 + number % 3)
+            )
+            sample_reservation(
+                table_obj=sample_table(number, 4),
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1)
+            )
+        for time_order in ('asc', 'dsc'):
+            url = RESERVATIONS_URL + \
+                f'?pagination=cursor&time_order={time_order}'
+            pks = []
+            while url:
+                with self.assertNumQueries(1):
+                    res = self.client.get(url)
+                self.assertNotIn('count', res.data)
+                pks += [result['pk'] for result in res.data['results']]
+                url = res.data['next']
+            expected = Reservation.objects.order_by('start_time', 'id')
+            if time_order == 'dsc':
+                expected = expected.reverse()
+            self.assertEqual(pks, [reservation.pk for reservation in expected])
+
+    def test_reservation_cursor_pagination_filters(self):
+        sample_reservation(table_obj=sample_table())
+        sample_reservation(table_obj=sample_table(11, 4))
+        res = self.client.get(
+            RESERVATIONS_URL + '?pagination=cursor&table_number=11'
+        )
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['table_number'], 11)
+        self.assertIsNone(res.data['next'])
+
+    def test_read_endpoints_render_serializer_output(self):
+        today = datetime.date.today()
+        for number in range(1, 4):
+            start_time = timezone.make_aware(datetime.datetime.combine(
+                today, datetime.time(12 + number, 15 * number, 30)
+            ))
+            sample_reservation(
+                table_obj=sample_table(number, 4),
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1)
+            )
+        reservations = Reservation.objects.order_by('pk')
+        expected = ReservationDetailSerializer(reservations, many=True).data
+        res = self.client.get(TODAY_RESERVATIONS_URL)
+        self.assertEqual(res.content, JSONRenderer().render(expected))
+        res = self.client.get(RESERVATIONS_URL + '?time_order=asc')
+        self.assertEqual(res.content, JSONRenderer().render({
+            'count': 3, 'next': None, 'previous': None, 'results': expected
+        }))
+        tables = TableSerializer(Table.objects.all(), many=True).data
+        res = self.client.get(TABLE_URL)
+        self.assertEqual(res.content, JSONRenderer().render({
+            'count': 3, 'next': None, 'previous': None, 'results': tables
+        }))
+
+    @shared_cache()
+    def test_list_tables_not_modified(self):
+        table = sample_table()
+        res = self.client.get(TABLE_URL)
+        etag = res['ETag']
+        with self.assertNumQueries(0):
+            res = self.client.get(TABLE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertNotIn('Last-Modified', res)
+        # A second change within the same second would still be 'modified
+        # since' a time, so only the ETag validates
+        res = self.client.get(
+            TABLE_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(TABLE_URL + '?page=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        table.num_of_seats = 4
+        table.save()
+        res = self.client.get(TABLE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    @shared_cache()
+    def test_today_reservations_not_modified(self):
+        table = sample_table()
+        res = self.client.get(TODAY_RESERVATIONS_URL)
+        etag = res['ETag']
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                TODAY_RESERVATIONS_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        sample_reservation(table_obj=table)
+        res = self.client.get(TODAY_RESERVATIONS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        etag = res['ETag']
+        table.number = 34
+        table.save()
+        res = self.client.get(TODAY_RESERVATIONS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['table_number'], 34)
+
+    def test_not_modified_needs_shared_cache(self):
+        sample_table()
+        res = self.client.get(TABLE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', res)
+        res = self.client.get(TABLE_URL, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_export_reservations_ndjson(self):
+        table = sample_table()
+        start = timezone.make_aware(datetime.datetime(2021, 9, 10, 15, 30))
+        reservation = sample_reservation(
+            table_obj=table,
+            start_time=start,
+            end_time=start + datetime.timedelta(hours=2)
+        )
+        sample_reservation(table_obj=sample_table(11, 4))
+        res = self.client.get(
+            EXPORT_RESERVATIONS_URL + f'?table_number={table.number}'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        with self.assertNumQueries(1):
+            lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{
+            'pk': reservation.pk,
+            'table_number': table.number,
+            'start_time': '2021-09-10T15:30:00+00:00',
+            'end_time': '2021-09-10T17:30:00+00:00'
+        }])
+
+    def test_export_reservations_csv(self):
+        today = datetime.date.today()
+        for number in range(1, 4):
+            start_time = datetime.datetime.combine(
+                today, datetime.time(20 - number)
+            )
+            sample_reservation(
+                table_obj=sample_table(number, 4),
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1)
+            )
+        res = self.client.get(
+            EXPORT_RESERVATIONS_URL + '?export_format=csv&time_order=asc'
+        )
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.reader(
+            b''.join(res.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(
+            rows[0], ['pk', 'table_number', 'start_time', 'end_time']
+        )
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            list(Reservation.objects.order_by(
+                'start_time').values_list('pk', flat=True))
+        )
+
+    def test_export_reservations_unknown_format(self):
+        res = self.client.get(EXPORT_RESERVATIONS_URL + '?export_format=xml')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_reservation_detail_view(self):
         table = sample_table()
         reservation = sample_reservation(table_obj=table)
@@ -159,6 +958,154 @@ class RestaurantAPITests(TestCase):
         payload.update({'table': table.number})
         self.assertEqual(res.data, payload)
 
+    def test_create_reservation_touching_another(self):
+        table = sample_table()
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(today, datetime.time(15)),
+            end_time=datetime.datetime.combine(today, datetime.time(17))
+        )
+        for start_time, end_time in [
+                ('01:30 PM', '03:00 PM'), ('05:00 PM', '06:00 PM')]:
+            payload = {
+                'table': table.number,
+                'start_time': start_time,
+                'end_time': end_time
+            }
+            res = self.client.post(RESERVATIONS_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_overlapping_reservation(self):
+        table = sample_table()
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(today, datetime.time(15)),
+            end_time=datetime.datetime.combine(today, datetime.time(17))
+        )
+        serializer = ReservationSerializer(data={
+            'table': table.number,
+            'start_time': '02:00 PM',
+            'end_time': '03:30 PM'
+        })
+        self.assertTrue(serializer.is_valid())
+        with self.assertRaisesMessage(
+                ValidationError,
+                'Invalid start or end time, please check available slots.'):
+            serializer.save()
+
+    def test_create_reservation_booked_concurrently(self):
+        table = sample_table()
+        today = datetime.date.today()
+        serializer = ReservationSerializer(data={
+            'table': table.number,
+            'start_time': '02:00 PM',
+            'end_time': '03:30 PM'
+        })
+        self.assertTrue(serializer.is_valid())
+        check_available_slots(Table.objects.all(), 2)
+        # Saved behind the cache's back, as if by a concurrent request
+        Reservation.objects.bulk_create([Reservation(
+            table=table,
+            start_time=datetime.datetime.combine(today, datetime.time(15)),
+            end_time=datetime.datetime.combine(today, datetime.time(17))
+        )])
+        with self.assertRaisesMessage(
+                ValidationError,
+                'Invalid start or end time, please check available slots.'):
+            serializer.save()
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_allocate_best_fitting_table(self):
+        sample_table(1, 2)
+        sample_table(2, 4)
+        sample_table(3, 8)
+        payload = {
+            'num_of_seats': 3,
+            'start_time': '07:00 PM',
+            'duration': 90
+        }
+        res = self.client.post(ALLOCATE_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['table_number'], 2)
+        self.assertEqual(res.data['start_time'], '07:00 PM')
+        self.assertEqual(res.data['end_time'], '08:30 PM')
+        res = self.client.post(ALLOCATE_URL, payload)
+        self.assertEqual(res.data['table_number'], 3)
+        res = self.client.post(ALLOCATE_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_allocate_after_closing(self):
+        sample_table()
+        res = self.client.post(ALLOCATE_URL, {
+            'num_of_seats': 2,
+            'start_time': '11:00 PM',
+            'duration': 120
+        })
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_allocate_table_booked_concurrently(self):
+        table = sample_table(1, 2)
+        sample_table(2, 4)
+        check_available_slots(Table.objects.all(), 2)
+        today = datetime.date.today()
+        # Saved behind the cache's back, as if by a concurrent request
+        Reservation.objects.bulk_create([Reservation(
+            table=table,
+            start_time=datetime.datetime.combine(today, datetime.time(15)),
+            end_time=datetime.datetime.combine(today, datetime.time(17))
+        )])
+        res = self.client.post(ALLOCATE_URL, {
+            'num_of_seats': 2,
+            'start_time': '04:00 PM',
+            'duration': 60
+        })
+        self.assertEqual(res.data['table_number'], 2)
+
+    def test_database_rejects_overlapping_reservations(self):
+        table = sample_table()
+        today = datetime.date.today()
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(today, datetime.time(15)),
+            end_time=datetime.datetime.combine(today, datetime.time(17))
+        )
+        sample_reservation(
+            table_obj=table,
+            start_time=datetime.datetime.combine(today, datetime.time(17)),
+            end_time=datetime.datetime.combine(today, datetime.time(18))
+        )
+        sample_reservation(
+            table_obj=sample_table(34),
+            start_time=datetime.datetime.combine(today, datetime.time(16)),
+            end_time=datetime.datetime.combine(today, datetime.time(18))
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            sample_reservation(
+                table_obj=table,
+                start_time=datetime.datetime.combine(
+                    today, datetime.time(16, 30)
+                ),
+                end_time=datetime.datetime.combine(today, datetime.time(19))
+            )
+
+    def test_database_rejects_reversed_reservations(self):
+        table = sample_table()
+        today = datetime.date.today()
+        for start, end in ((17, 15), (16, 16)):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                sample_reservation(
+                    table_obj=table,
+                    start_time=datetime.datetime.combine(
+                        today, datetime.time(start)
+                    ),
+                    end_time=datetime.datetime.combine(
+                        today, datetime.time(end)
+                    )
+                )
+
     def test_delete_reservation(self):
         table = sample_table()
         reservation = sample_reservation(table_obj=table)
@@ -166,6 +1113,29 @@ class RestaurantAPITests(TestCase):
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    @override_settings(TIME_ZONE='Pacific/Kiritimati')
+    def test_reservations_fall_on_the_local_day(self):
+        # Fourteen hours ahead, 01:00 PM is the day before in UTC
+        table = sample_table()
+        payload = {
+            'table': table.number,
+            'start_time': '01:00 PM',
+            'end_time': '02:00 PM'
+        }
+        res = self.client.post(RESERVATIONS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get()
+        self.assertEqual(
+            timezone.localtime(reservation.start_time).date(),
+            timezone.localdate()
+        )
+        res = self.client.get(TODAY_RESERVATIONS_URL)
+        self.assertEqual(
+            [row['pk'] for row in res.data], [reservation.pk]
+        )
+        res = self.client.delete(reservation_detail_url(reservation.pk))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_filter_reservations_by_number(self):
         rsv_1 = sample_reservation(table_obj=sample_table())
         sample_reservation(table_obj=sample_table(11, 4))
@@ -217,3 +1187,245 @@ class RestaurantAPITests(TestCase):
         serializer = ReservationDetailSerializer(reservations, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
+
+
+class RecordingBroadcast:
+    messages = []
+
+    def active(self):
+        return True
+
+    def publish(self, message):
+        self.messages.append(message)
+
+
+@override_settings(
+    AVAILABILITY_BROADCAST_BACKEND='restaurant.tests.RecordingBroadcast'
+)
+class AvailabilityBroadcastTests(TestCase):
+
+    def setUp(self):
+        RecordingBroadcast.messages.clear()
+        cache.clear()
+
+    def test_reservation_pushes_its_table(self):
+        table = sample_table()
+        start = timezone.localtime().replace(
+            hour=14, minute=0, second=0, microsecond=0
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_reservation(
+                table, start, start + datetime.timedelta(hours=1)
+            )
+        self.assertEqual(RecordingBroadcast.messages[-1], {
+            'number': 33,
+            'num_of_seats': 7,
+            'slots': ['01:00 PM - 02:00 PM', '03:00 PM - 11:59 PM'],
+        })
+
+    def test_past_reservation_is_not_pushed(self):
+        table = sample_table()
+        RecordingBroadcast.messages.clear()
+        start = timezone.now() - datetime.timedelta(days=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_reservation(
+                table, start, start + datetime.timedelta(hours=1)
+            )
+        self.assertEqual(RecordingBroadcast.messages, [])
+
+    def test_deleted_table_has_no_slots(self):
+        table = sample_table()
+        with self.captureOnCommitCallbacks(execute=True):
+            table.delete()
+        self.assertEqual(RecordingBroadcast.messages[-1], {
+            'number': 33,
+            'num_of_seats': 7,
+            'slots': [],
+        })
+
+    def test_local_broadcast_delivers_from_other_threads(self):
+        broadcast = LocalBroadcast()
+        self.assertFalse(broadcast.active())
+
+        async def listen():
+            queue = broadcast.subscribe()
+            await sync_to_async(broadcast.publish, thread_sensitive=False)(
+                {'number': 1}
+            )
+            message = await queue.get()
+            broadcast.unsubscribe(queue)
+            return message
+        self.assertEqual(asyncio.run(listen()), {'number': 1})
+        self.assertFalse(broadcast.active())
+
+    def test_local_broadcast_drops_slow_subscribers(self):
+        broadcast = LocalBroadcast()
+        broadcast.max_queued = 2
+
+        async def listen():
+            queue = broadcast.subscribe()
+            for number in range(3):
+                await sync_to_async(
+                    broadcast.publish, thread_sensitive=False
+                )({'number': number})
+            await asyncio.sleep(0)
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+        self.assertEqual(asyncio.run(listen()), [None])
+        self.assertFalse(broadcast.active())
+
+
+class AvailableSlotsStreamTests(TransactionTestCase):
+    # The stream reads the database from the thread pool, which only sees
+    # committed rows
+
+    def setUp(self):
+        cache.clear()
+        self.table = sample_table()
+        sample_table(87, 2)
+        admin = get_user_model().objects.create(
+            employee_number='9999', name='test', role='Admin'
+        )
+        self.token = str(AccessToken.for_user(admin))
+
+    @classmethod
+    def tearDownClass(cls):
+        close_thread_connections()
+        super().tearDownClass()
+
+    def stream(self, query, during=None):
+        sent = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        async def run():
+            scope = {
+                'type': 'http',
+                'headers': [],
+                'query_string': f'{query}&token={self.token}'.encode(),
+            }
+            stream = asyncio.ensure_future(
+                available_slots_stream(scope, receive, send)
+            )
+            while len(sent) < 2 and not stream.done():
+                await asyncio.sleep(0.01)
+            if during is not None:
+                await sync_to_async(during, thread_sensitive=False)()
+                await asyncio.sleep(0.1)
+            disconnected.set()
+            await stream
+        asyncio.run(run())
+        return sent
+
+    def test_snapshot_then_changes(self):
+        start = timezone.localtime().replace(
+            hour=14, minute=0, second=0, microsecond=0
+        )
+        sent = self.stream('num_of_seats=5', lambda: sample_reservation(
+            self.table, start, start + datetime.timedelta(hours=1)
+        ))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertEqual(
+            [message['body'] for message in sent[1:]],
+            [
+                b'event: snapshot\ndata: {"ordered_available_slots": '
+                b'[{"table #33": ["01:00 PM - 11:59 PM"]}]}\n\n',
+                b'event: change\ndata: {"table #33": '
+                b'["01:00 PM - 02:00 PM", "03:00 PM - 11:59 PM"]}\n\n',
+            ]
+        )
+
+    def test_other_tables_are_filtered_out(self):
+        sent = self.stream('tables=87', lambda: sample_reservation(
+            self.table
+        ))
+        self.assertEqual(len(sent), 2)
+
+    def test_dropped_stream_ends(self):
+        def drop():
+            # What LocalBroadcast leaves to a subscriber it dropped
+            broadcast = get_broadcast()
+            for queue, loop in list(broadcast.subscribers.items()):
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+        sent = self.stream('num_of_seats=2', drop)
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(sent[-1], {'type': 'http.response.body'})
+
+    def test_token_required(self):
+        self.token = 'invalid'
+        self.assertEqual(self.stream('num_of_seats=2')[0]['status'], 401)
+
+    def test_subscription_required(self):
+        self.assertEqual(self.stream('num_of_seats=x')[0]['status'], 400)
+
+
+class ASGIExportTests(TransactionTestCase):
+    # Rows are read from a thread of the ASGI handler, which only sees
+    # committed rows
+
+    def setUp(self):
+        admin = get_user_model().objects.create(
+            employee_number='9999', name='test', role='Admin'
+        )
+        self.token = str(AccessToken.for_user(admin))
+
+    @classmethod
+    def tearDownClass(cls):
+        close_thread_connections()
+        super().tearDownClass()
+
+    def get(self, path):
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path.split('?')[0],
+            'query_string': path.partition('?')[2].encode(),
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', f'Bearer {self.token}'.encode()),
+            ],
+        }
+        asyncio.run(application(scope, receive, send))
+        return sent
+
+    def test_export_streams_under_asgi(self):
+        table = sample_table()
+        start = timezone.make_aware(datetime.datetime(2021, 9, 10, 15))
+        # More rows than the handler reads at a time
+        Reservation.objects.bulk_create(
+            Reservation(
+                table=table,
+                start_time=start + datetime.timedelta(days=day),
+                end_time=start + datetime.timedelta(days=day, hours=1)
+            )
+            for day in range(1200)
+        )
+        sent = self.get(EXPORT_RESERVATIONS_URL)
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn(
+            (b'Content-Type', b'application/x-ndjson'), sent[0]['headers']
+        )
+        self.assertGreater(len(sent), 3)
+        self.assertFalse(sent[-1].get('more_body', False))
+        lines = b''.join(
+            message.get('body', b'') for message in sent[1:]
+        ).splitlines()
+        self.assertEqual(len(lines), 1200)
+        self.assertEqual(json.loads(lines[0])['table_number'], table.number)
+
+    def test_export_errors_under_asgi(self):
+        sent = self.get(EXPORT_RESERVATIONS_URL + '?export_format=xml')
+        self.assertEqual(sent[0]['status'], 400)
@@ -1,6 +1,8 @@
 from rest_framework.routers import DefaultRouter
+from django.conf import settings
 from django.urls import path, include
 from restaurant import views
+from restaurant.async_views import thread_pool_routes
 
 
 app_name = 'restaurant'
@@ -12,5 +14,8 @@ router.register('reservations', views.ReservationViewSet)
 
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(
+        thread_pool_routes(router.urls) if settings.ASYNC_VIEWS
+        else router.urls
+    ))
 ]
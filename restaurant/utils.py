@@ -1,85 +1,209 @@
-from django.db.models import F, Func, Value, CharField
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
 import datetime
 from restaurant.local_requirements.interval import Interval, IntervalSet
+from restaurant.models import Table, Reservation
+from restaurant.availability import AvailabilityIndex, format_time
+from restaurant.cache import get_reservation_times
 
 
 restaurant_start_time = datetime.timedelta(hours=13).seconds
 restaurant_end_time = datetime.timedelta(hours=23, minutes=59).seconds
 
 
-def normalize_table(table):
-    today = datetime.date.today()
-    qs = table.reservations.filter(
-        start_time__year=today.year,
-        start_time__month=today.month,
-        start_time__day=today.day
+def humanize(seconds):
+    return format_time(seconds)
+
+
+def time_to_seconds(time):
+    return time.hour * 3600 + time.minute * 60 + time.second
+
+
+def day_bounds(first_day, last_day=None):
+    # Half-open [start, end) range of the days in the current time zone,
+    # compared against the bare column so that its indexes can be used.
+    last_day = last_day or first_day
+    start = timezone.make_aware(
+        datetime.datetime.combine(first_day, datetime.time.min)
+    )
+    end = timezone.make_aware(
+        datetime.datetime.combine(
+            last_day + datetime.timedelta(days=1), datetime.time.min
+        )
+    )
+    return start, end
+
+
+def minute_of_day_seconds(value, tz=None):
+    # Seconds since midnight in the current time zone, truncated to the
+    # minute like the slots shown to the user. Callers converting many
+    # values look the time zone up once and pass it as tz.
+    if timezone.is_aware(value):
+        value = timezone.localtime(value, tz)
+    return value.hour * 3600 + value.minute * 60
+
+
+def load_reservation_times(pks, day):
+    # One query for every table, grouped by table in Python.
+    grouped = {pk: [] for pk in pks}
+    start, end = day_bounds(day)
+    qs = Reservation.objects.filter(
+        table_id__in=pks,
+        start_time__gte=start,
+        start_time__lt=end
     )
-    times = qs.annotate(
-        formatted_start_time=Func(
-            F('start_time'),
-            Value('HH:MM AM'),
-            function='to_char',
-            output_field=CharField()
-        ),
-        formatted_end_time=Func(
-            F('end_time'),
-            Value('HH:MM AM'),
-            function='to_char',
-            output_field=CharField()
+    times = qs.values_list('table_id', 'start_time', 'end_time')
+    tz = timezone.get_current_timezone()
+    for table_id, start, end in times:
+        grouped[table_id].append(
+            (minute_of_day_seconds(start, tz), minute_of_day_seconds(end, tz))
         )
-    ).values_list('formatted_start_time', 'formatted_end_time')
-    times = sorted(list(times))
-
-    times_in_seconds = []
-    for i in times:
-        s = datetime.datetime.strptime(i[0], '%I:%M %p') - datetime.datetime(1900, 1, 1)
-        t = datetime.datetime.strptime(i[1], '%I:%M %p') - datetime.datetime(1900, 1, 1)
-        times_in_seconds.append(Interval(s.total_seconds(), t.total_seconds()))
+    return grouped
+
+
+def reservation_times(tables):
+    return get_reservation_times(
+        [table.pk for table in tables],
+        timezone.localdate(),
+        load_reservation_times
+    )
+
+
+def reservations_by_table(tables):
+    return {
+        pk: [Interval(start, end) for start, end in times]
+        for pk, times in reservation_times(tables).items()
+    }
+
+
+def availability_index(tables):
+    index = AvailabilityIndex(
+        restaurant_start_time, restaurant_end_time, tables
+    )
+    for pk, times in reservation_times(tables).items():
+        for start, end in times:
+            index.book(pk, start, end)
+    return index
+
+
+def free_intervals(reservations):
     bigger_intv = IntervalSet(
             [Interval(restaurant_start_time, restaurant_end_time)]
         )
-    small_intv = IntervalSet(times_in_seconds)
-    intervals = bigger_intv - small_intv
-    humanize_intervals = [(i.lower_bound, i.upper_bound) for i in intervals.intervals]
-
-    output_times = []
-    for i in humanize_intervals:
-        start = datetime.datetime.strptime(
-            str(datetime.timedelta(seconds=i[0])),
-            '%H:%M:%S'
-        ).strftime('%I:%M %p')
-        end = datetime.datetime.strptime(
-            str(datetime.timedelta(seconds=i[1])),
-            '%H:%M:%S'
-        ).strftime('%I:%M %p')
-        output_times.append(f'{start} - {end}')
-    return output_times
-
-
-def check_available_slots(queryset, num_of_seats):
+    return bigger_intv - IntervalSet(reservations)
+
+
+RESERVATION_COLUMNS = ('pk', 'table__number', 'start_time', 'end_time')
+
+
+def reservation_rows(values):
+    # What ReservationDetailSerializer returns, built from values() rows
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            'pk': row['pk'],
+            'table_number': row['table__number'],
+            'start_time': format_time(
+                minute_of_day_seconds(row['start_time'], tz)
+            ),
+            'end_time': format_time(minute_of_day_seconds(row['end_time'], tz))
+        }
+        for row in values
+    ]
+
+
+def humanize_intervals(intervals):
+    return [
+        f'{humanize(i.lower_bound)} - {humanize(i.upper_bound)}'
+        for i in intervals.intervals
+    ]
+
+
+def fits_free_slot(free, start_time, end_time):
+    start, end = sorted(
+        (time_to_seconds(start_time), time_to_seconds(end_time))
+    )
+    # Both ends may touch the boundary of a free slot, so the open
+    # interval between them has to lie inside a single slot.
+    return Interval(start, end, closed=False) in free
+
+
+def is_bookable(table, start_time, end_time):
+    reservations = reservations_by_table([table])[table.pk]
+    return fits_free_slot(free_intervals(reservations), start_time, end_time)
+
+
+def check_available_slots(
+            queryset, num_of_seats, start_time=None, end_time=None
+        ):
     if int(num_of_seats) <= 0:
         return []
-    tables = queryset.filter(
+    tables = list(queryset.filter(
         num_of_seats__gte=num_of_seats,
-    ).order_by('num_of_seats')
-    serialized_data = [{f'table #{table.number}': normalize_table(table)} for table in tables]
+    ).order_by('num_of_seats'))
+    index = availability_index(tables)
+    if start_time is not None and end_time is not None:
+        # Only the tables free for the whole requested block
+        free = set(index.free_tables(
+            int(num_of_seats),
+            time_to_seconds(start_time),
+            time_to_seconds(end_time)
+        ))
+        tables = [table for table in tables if table.pk in free]
+    serialized_data = [
+        {f'table #{table.number}': index.slots(table.pk)}
+        for table in tables
+    ]
     return serialized_data
 
 
-def reformat(time):
-    return datetime.datetime.strptime(
-        time, '%I:%M %p'
-    ).strftime('%H:%M %p')
-
-
-def in_between(time, start, end):
-    return start <= time <= end
+def check_table_combinations(
+            queryset, num_of_seats, start_time=None, end_time=None
+        ):
+    if int(num_of_seats) <= 0:
+        return []
+    tables = {table.pk: table for table in queryset}
+    index = availability_index(tables.values())
+    bounds = ()
+    if start_time is not None and end_time is not None:
+        bounds = (time_to_seconds(start_time), time_to_seconds(end_time))
+    return [
+        {
+            'tables': [tables[pk].number for pk in pks],
+            'wasted_seats': wasted_seats,
+            # The free time the tables have in common
+            'slots': index.format_runs(index.common_runs(pks))
+        }
+        for wasted_seats, pks in index.combinations(
+            int(num_of_seats), *bounds
+        )
+    ]
 
 
-def check_time_between(time, intervals):
-    times = [(reformat(i.split(' - ')[0]), reformat(i.split(' - ')[1])) for i in intervals]
-    for interval in times:
-        if in_between(time[0], interval[0], interval[1]) and \
-                in_between(time[1], interval[0], interval[1]):
-            return True
-    return False
+def allocate_table(num_of_seats, start_time, duration):
+    # Books the best fitting table for the party, or returns None
+    tables = {
+        table.pk: table
+        for table in Table.objects.filter(num_of_seats__gte=num_of_seats)
+    }
+    index = availability_index(tables.values())
+    start = time_to_seconds(start_time)
+    end = start + duration * 60
+    start_time = timezone.localtime().replace(
+        hour=start_time.hour,
+        minute=start_time.minute,
+        second=0,
+        microsecond=0
+    )
+    for pk in index.best_tables(num_of_seats, start, end):
+        try:
+            with transaction.atomic():
+                return Reservation.objects.create(
+                    table=tables[pk],
+                    start_time=start_time,
+                    end_time=start_time + datetime.timedelta(minutes=duration)
+                )
+        except (IntegrityError, DataError):
+            # Booked concurrently, the next best table may still be free
+            continue
+    return None
@@ -3,14 +3,52 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
 from restaurant.serializers import (
     TableSerializer, ReservationSerializer, ReservationDetailSerializer,
-    CheckAvailableSlotsSerializer
+    CheckAvailableSlotsSerializer, AllocateTableSerializer
 )
 from restaurant.models import Table, Reservation
 from restaurant.permissions import IsAdminOrNone
-from restaurant.utils import check_available_slots
+from restaurant.pagination import ReservationCursorPagination
+from restaurant.utils import (
+    allocate_table, check_available_slots, check_table_combinations,
+    day_bounds, reservation_rows, RESERVATION_COLUMNS
+)
+from restaurant.archive import archive_reservations
+from restaurant.cache import (
+    invalidate, is_shared, last_change, day_key, TABLES_KEY
+)
+from restaurant.exports import FORMATS
 import datetime
+import hashlib
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def conditional_get(request, keys, respond):
+    # Answers 304 Not Modified from the last changes recorded in the cache,
+    # without querying the rows when the client's copy is still current.
+    if not is_shared():
+        # Every process would only know about its own writes
+        return respond()
+    versions = ':'.join(last_change(key) for key in keys)
+    # The only validator, since a time has no room for several changes
+    # within the same second
+    etag = quote_etag(hashlib.md5(
+        f'{versions}:{request.accepted_renderer.format}:'
+        f'{request.get_full_path()}'.encode()
+    ).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = respond()
+    response['ETag'] = etag
+    return response
 
 
 class TabletViewSet(ModelViewSet):
@@ -20,29 +58,65 @@ class TabletViewSet(ModelViewSet):
     lookup_field = 'number'
     http_method_names = ['get', 'post', 'delete']
 
+    def list(self, request):
+        return conditional_get(request, [TABLES_KEY], self.list_tables)
+
+    def list_tables(self):
+        # Rows straight from the columns, same output as TableSerializer
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            'number', 'num_of_seats'
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
     def get_serializer_class(self):
-        if self.action in ['check_available_slots']:
+        if self.action in [
+            'check_available_slots', 'check_table_combinations'
+        ]:
             return CheckAvailableSlotsSerializer
         return self.serializer_class
 
     def destroy(self, request, number=None):
         table = self.get_object()
-        if table.reservations.all():
-            response = {
-                'message': 'Not permitted, the table has reservations.'
-            }
-            return Response(response, status=status.HTTP_403_FORBIDDEN)
-        else:
+        now = timezone.now()
+        with transaction.atomic():
+            # No reservation can be added to the locked table, so none slips
+            # in between the check and the delete
+            table = Table.objects.select_for_update().get(pk=table.pk)
+            past = table.reservations.filter(end_time__lte=now)
+            if request.query_params.get('allow_past') == 'true':
+                # Only upcoming reservations keep the table, the past ones
+                # are archived along with its number
+                kept = table.reservations.filter(end_time__gt=now)
+            else:
+                kept = table.reservations.all()
+            if kept.exists():
+                response = {
+                    'message': 'Not permitted, the table has reservations.'
+                }
+                return Response(response, status=status.HTTP_403_FORBIDDEN)
+            pk = table.pk
+            archive_reservations(past)
             table.delete()
-            response = {'message': 'Deleted successfully.'}
-            return Response(response, status=status.HTTP_200_OK)
+        invalidate(pk, timezone.localdate())
+        response = {'message': 'Deleted successfully.'}
+        return Response(response, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['POST'], url_path='check-available-slots')
     def check_available_slots(self, request):
         queryset = self.queryset
         num_of_seats = request.data['num_of_seats']
         if num_of_seats.isdigit():
-            slots = check_available_slots(queryset, num_of_seats)
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            slots = check_available_slots(
+                queryset,
+                num_of_seats,
+                serializer.validated_data.get('start_time'),
+                serializer.validated_data.get('end_time')
+            )
             return Response(
                 {'ordered_available_slots': slots},
                 status=status.HTTP_200_OK
@@ -52,21 +126,47 @@ class TabletViewSet(ModelViewSet):
             status=status.HTTP_403_FORBIDDEN
         )
 
+    @action(
+        detail=False, methods=['POST'], url_path='check-table-combinations'
+    )
+    def check_table_combinations(self, request):
+        # For parties bigger than any table
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        combinations = check_table_combinations(
+            self.queryset,
+            serializer.validated_data['num_of_seats'],
+            serializer.validated_data.get('start_time'),
+            serializer.validated_data.get('end_time')
+        )
+        return Response(
+            {'table_combinations': combinations},
+            status=status.HTTP_200_OK
+        )
+
 
 class ReservationViewSet(ModelViewSet):
-    queryset = Reservation.objects.all()
+    # The table number is serialized with every reservation
+    queryset = Reservation.objects.select_related('table')
     serializer_class = ReservationDetailSerializer
     http_method_names = ['get', 'post', 'delete']
 
     def get_permissions(self):
-        if self.action in ['list']:
+        if self.action in ['list', 'export']:
             self.permission_classes = (IsAdminOrNone,)
         else:
             self.permission_classes = (IsAuthenticated,)
         return super(ReservationViewSet, self).get_permissions()
 
+    @property
+    def paginator(self):
+        # Clients opt in to cursor pages with ?pagination=cursor
+        if self.request.query_params.get('pagination') == 'cursor':
+            self.pagination_class = ReservationCursorPagination
+        return super(ReservationViewSet, self).paginator
+
     def get_queryset(self):
-        queryset = Reservation.objects.all()
+        queryset = self.queryset.all()
 
         if self.request.user.role == 'Admin':
             time_order = self.request.query_params.get('time_order', 0)
@@ -89,21 +189,35 @@ class ReservationViewSet(ModelViewSet):
                     end = datetime.datetime.strptime(
                             date_range.split(',')[1], '%d-%m-%Y'
                         ).date()
+                    start, end = day_bounds(start, end)
                     queryset = queryset.filter(
-                        start_time__date__range=[start, end]
+                        start_time__gte=start,
+                        start_time__lt=end
                     )
                 except Exception as e:
-                    print(e)
+                    logger.warning('Ignored date_range %r: %s', date_range, e)
         return queryset
 
+    def list(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *RESERVATION_COLUMNS
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reservation_rows(page))
+        return Response(reservation_rows(queryset))
+
     def get_serializer_class(self):
         if self.action in ['post', 'create']:
             return ReservationSerializer
+        if self.action == 'allocate':
+            return AllocateTableSerializer
         return self.serializer_class
 
     def destroy(self, request, pk=None):
         reservation = self.get_object()
-        if reservation.start_time.date() == datetime.date.today():
+        day = timezone.localtime(reservation.start_time).date()
+        if day == timezone.localdate():
             reservation.delete()
             response = {'message': 'Deleted Successfully.'}
             return Response(response, status=status.HTTP_200_OK)
@@ -112,15 +226,55 @@ class ReservationViewSet(ModelViewSet):
 
     @action(detail=False, methods=['GET'], url_path='today-reservations')
     def today_reservations(self, request):
-        today = datetime.date.today()
+        today = timezone.localdate()
+        start, end = day_bounds(today)
         query_set = self.queryset.filter(
-            start_time__year=today.year,
-            start_time__month=today.month,
-            start_time__day=today.day
+            start_time__gte=start,
+            start_time__lt=end
+        ).values(*RESERVATION_COLUMNS)
+        return conditional_get(
+            request,
+            # Reservations show the number of their table
+            [day_key(today), TABLES_KEY],
+            lambda: Response(reservation_rows(query_set))
+        )
+
+    @action(detail=False, methods=['POST'], url_path='allocate')
+    def allocate(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reservation = allocate_table(
+            serializer.validated_data['num_of_seats'],
+            serializer.validated_data['start_time'],
+            serializer.validated_data['duration']
         )
-        serializer = self.serializer_class(
-            query_set,
-            many=True,
-            context={'request': request}
+        if reservation is None:
+            return Response(
+                {'message': 'No table is free for that party at that time.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            ReservationDetailSerializer(reservation).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['GET'], url_path='export')
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in FORMATS:
+            return Response(
+                {'message': 'Only ndjson and csv exports are supported.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, lines = FORMATS[export_format]
+        # Rows are read in chunks through a server-side cursor and written
+        # out as they come, so memory stays flat however many there are.
+        rows = self.get_queryset().values_list(
+            'pk', 'table__number', 'start_time', 'end_time'
+        ).iterator(chunk_size=2000)
+        response = StreamingHttpResponse(
+            lines(rows), content_type=content_type
         )
-        return Response(serializer.data)
+        response['Content-Disposition'] = \
+            f'attachment; filename="reservations.{export_format}"'
+        return response
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BasicAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from users.cache import active_user, password_fingerprint
+
+
+CREDENTIALS_CACHE_TIMEOUT = 60
+
+
+def credentials_key(userid, password):
+    # The key is a keyed HMAC, so the password can't be read back from it
+    digest = salted_hmac(
+        'users.authentication.credentials',
+        f'{userid}:{password}',
+        algorithm='sha256'
+    ).hexdigest()
+    return f'users:basic:{digest}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the users it looked up in the cache, saving
+    a query on every authenticated request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        user, _fingerprint = active_user(user_id)
+        if user is None:
+            # Raises the usual errors for unknown and inactive users
+            return super().get_user(validated_token)
+        return user
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication that remembers successful verifications for a
+    while, so repeated requests skip the password hashing.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = credentials_key(userid, password)
+        verified = cache.get(key)
+        if verified is not None:
+            user_id, fingerprint = verified
+            user, current = active_user(user_id)
+            # The cached user gets a new version when the password changes
+            # or the user is deactivated, so its fingerprint is current.
+            if user is not None and constant_time_compare(
+                    current, fingerprint):
+                return (user, None)
+            cache.delete(key)
+        user, auth = super().authenticate_credentials(
+            userid, password, request
+        )
+        cache.set(key, (
+            getattr(user, api_settings.USER_ID_FIELD),
+            password_fingerprint(user.password)
+        ), CREDENTIALS_CACHE_TIMEOUT)
+        return (user, auth)
@@ -0,0 +1,82 @@
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Bounds how long a change made outside the ORM (e.g. a raw UPDATE) can go
+# unnoticed; saves, deletes and queryset updates invalidate it right away.
+USER_CACHE_TIMEOUT = 60
+
+
+def version_key(user_id):
+    return f'users:version:{user_id}'
+
+
+def user_key(user_id, version):
+    return f'users:user:{user_id}:{version}'
+
+
+def cached_fields():
+    # The password stays out of the cache, only its fingerprint goes in
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname != 'password'
+    ]
+
+
+def password_fingerprint(password):
+    # Changes with set_password() and the hasher upgrades done on login
+    return salted_hmac(
+        'users.authentication.password',
+        password,
+        algorithm='sha256'
+    ).hexdigest()
+
+
+def user_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, USER_CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_user(user_id):
+    # A new version rather than a delete, so a request that read the row
+    # before the change can't put it back under the key readers use
+    def change():
+        cache.set(version_key(user_id), uuid.uuid4().hex, USER_CACHE_TIMEOUT)
+    change()
+    if transaction.get_connection().in_atomic_block:
+        # Requests may cache the uncommitted row until the commit
+        transaction.on_commit(change)
+
+
+def active_user(user_id):
+    """
+    Returns the active user with the given USER_ID_FIELD value along with
+    the fingerprint of its password, or (None, None).
+
+    The user is rebuilt from the cached fields with the password deferred,
+    so reading it (or saving the user) goes to the database.
+    """
+    User = get_user_model()
+    fields = cached_fields()
+    key = user_key(user_id, user_version(user_id))
+    entry = cache.get(key)
+    if entry is None:
+        row = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).values_list(*fields, 'password').first()
+        if row is None:
+            return (None, None)
+        entry = (row[:-1], password_fingerprint(row[-1]))
+        cache.set(key, entry, USER_CACHE_TIMEOUT)
+    values, fingerprint = entry
+    user = User.from_db(router.db_for_read(User), fields, values)
+    return (user, fingerprint)
@@ -1,7 +1,24 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
+from rest_framework_simplejwt.settings import api_settings
+from users.cache import invalidate_user
 
 
-class CustomUserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Updates send no signals, so the cached users are dropped here
+        user_ids = list(self.values_list(
+            api_settings.USER_ID_FIELD, flat=True
+        ))
+        rows = super().update(**kwargs)
+        for user_id in user_ids:
+            invalidate_user(user_id)
+        return rows
+
+    update.alters_data = True
+
+
+class CustomUserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """
     Custom user model manager where employee number is the unique identifiers
     for authentication instead of usernames.
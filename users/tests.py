@@ -0,0 +1,169 @@
+import base64
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.cache import (
+    active_user, password_fingerprint, user_key, user_version
+)
+
+
+CREATE_USER_URL = reverse('users:create_user')
+
+
+def sample_user(employee_number='9999', role='Admin'):
+    return get_user_model().objects.create_user(
+        employee_number=employee_number,
+        password='pass123',
+        name='test',
+        role=role
+    )
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+
+    def create_user(self, employee_number):
+        return self.client.post(CREATE_USER_URL, {
+            'employee_number': employee_number,
+            'password': 'pass123',
+            'name': 'new',
+            'role': 'Employee',
+        })
+
+    def test_user_is_looked_up_once(self):
+        self.assertEqual(
+            self.create_user('1001').status_code, status.HTTP_201_CREATED
+        )
+        # Only the uniqueness check and the insert of the new user
+        with self.assertNumQueries(2):
+            res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_role_change_applies_to_issued_tokens(self):
+        self.create_user('1001')
+        self.user.role = 'Employee'
+        self.user.save()
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_is_rejected(self):
+        self.create_user('1001')
+        self.user.is_active = False
+        self.user.save()
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.create_user('1001')
+        self.user.delete()
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_queryset_update_applies_to_issued_tokens(self):
+        self.create_user('1001')
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_is_not_cached(self):
+        user, fingerprint = active_user(self.user.pk)
+        self.assertEqual(user.get_deferred_fields(), {'password'})
+        self.assertEqual(user.role, 'Admin')
+        entry = cache.get(user_key(self.user.pk, user_version(self.user.pk)))
+        self.assertNotIn(self.user.password, repr(entry))
+        self.assertEqual(fingerprint, password_fingerprint(self.user.password))
+        # Reading the password loads it
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('pass123'))
+
+    def test_user_id_field(self):
+        with override_settings(SIMPLE_JWT={
+            'USER_ID_FIELD': 'employee_number'
+        }):
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+            )
+            res = self.create_user('1001')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.user.role = 'Employee'
+            self.user.save()
+            res = self.create_user('1002')
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CachedBasicAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = sample_user()
+        self.client = APIClient()
+
+    def authenticate(self, password='pass123'):
+        credentials = base64.b64encode(
+            f'{self.user.employee_number}:{password}'.encode()
+        ).decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+
+    def create_user(self, employee_number):
+        return self.client.post(CREATE_USER_URL, {
+            'employee_number': employee_number,
+            'password': 'pass123',
+            'name': 'new',
+            'role': 'Employee',
+        })
+
+    def test_password_is_verified_once(self):
+        self.authenticate()
+        with mock.patch.object(
+                get_user_model(), 'check_password',
+                autospec=True,
+                side_effect=get_user_model().check_password) as check:
+            self.assertEqual(
+                self.create_user('1001').status_code,
+                status.HTTP_201_CREATED
+            )
+            self.assertEqual(
+                self.create_user('1002').status_code,
+                status.HTTP_201_CREATED
+            )
+        self.assertEqual(check.call_count, 1)
+
+    def test_wrong_password_is_rejected(self):
+        self.authenticate()
+        self.create_user('1001')
+        self.authenticate('wrong')
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_cached_credentials(self):
+        self.authenticate()
+        self.create_user('1001')
+        self.user.set_password('new-pass123')
+        self.user.save()
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authenticate('new-pass123')
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.create_user('1001')
+        self.user.is_active = False
+        self.user.save()
+        res = self.create_user('1002')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)